@@ -1,61 +1,81 @@
+import os
 import time
 import heapq
+import queue
 import psutil
+import multiprocessing
+from array import array
+from Modules.Engine import Level
+from Modules.Heuristic import MatchingHeuristic, INFINITY
+from Modules.PriorityQueue import BucketQueue, TIE_LOW_H
 
-# class Node: define a node in the search tree
+PARALLEL_BATCH = 64  # expansions a parallel worker makes between two flushes of its outgoing batches
+PARALLEL_GRACE = 5  # seconds the master still waits on live workers for traces and stats past the time limit
+
+# class NodePool: the search nodes stored column by column
 #=======================================================================================================
-#=========================================== BEGIN CLASS: NODE =========================================
-class Node:
-    def __init__(self, ares_position=None, boxes=None, grid=None, g=0, h=None, parent=None, action=None, search_time=0):
-        self.ares_position = ares_position
-        self.boxes = boxes if boxes is not None else []
-        self.grid = grid
-        self.g = g
-        self.h = h if h is not None else 0
-        self.parent = parent
-        self.action = action
-        self.search_time = search_time
-
-    @property
-    def f(self):
-        """the function to calculate the total cost of the node (heuristic + cost)"""
-        return self.g + self.h
-
-    def __eq__(self, other):
-        """the function to compare two nodes"""
-        return self.ares_position == other.ares_position and self.boxes == other.boxes
-
-    def __hash__(self):
-        """the function to hash a node"""
-        return hash((self.ares_position, tuple(self.boxes)))
-
-    def __lt__(self, other):
-        """the function to compare two nodes"""
-        return self.f < other.f
-
-    def get_path(self):
-        """the function to get the path from the root node to the current node"""
+#=========================================== BEGIN CLASS: NODE POOL ====================================
+class NodePool:
+    def __init__(self):
+        # a node is only an index into these parallel columns
+        self.parents = array('i')  # index of the parent node, -1 for the root
+        self.actions = array('I')  # move letter code, or stone index * 4 + direction for a push (any stone count)
+        self.g = array('q')
+        self.h = array('q')
+        self.players = array('i')  # cell Ares stands on, which a push-level state only keeps as its region
+        self.states = []  # engine states: Ares' cell, stone cells and their incremental hash
+        self.assignments = []  # stone-to-switch matching behind h, repaired instead of recomputed
+
+    def __len__(self):
+        return len(self.parents)
+
+    def add(self, state, g, h, parent=-1, action=0, assignment=None, player=-1):
+        """the function to store a new node and return its index"""
+        self.parents.append(parent)
+        self.actions.append(action)
+        self.g.append(g)
+        self.h.append(h)
+        self.players.append(player)
+        self.states.append(state)
+        self.assignments.append(assignment)
+        return len(self.parents) - 1
+
+    def f(self, index):
+        """the function to calculate the total cost of a node (heuristic + cost)"""
+        return self.g[index] + self.h[index]
+
+    def get_path(self, index):
+        """the function to get the node indices from the root node to the given node"""
         path = []
-        node = self
-
-        # get the path from the root node to the current node (backward)
-        while node.parent:
-            path.append(node.action)
-            node = node.parent
+        while index >= 0:
+            path.append(index)
+            index = self.parents[index]
         path.reverse()
-        return ''.join(path)
+        return path
 #=======================================================================================================
-#=========================================== END CLASS: NODE =========================================== 
+#=========================================== END CLASS: NODE POOL ====================================== 
 
 # class A_Star_Search: define the A* search algorithm
 #=======================================================================================================
 #=========================================== BEGIN CLASS: A_Star_Search ================================ 
 class A_Star_Search:
-    def __init__(self, initial_state, goals, weights):
-        self.initial_state = initial_state
-        self.goals = goals
-        self.weights = weights
-        self.open_list = []
+    """
+    A* over the compiled level, optimal at the step level.
+    With push_level a node is the stone layout plus the canonical cell of the player's region and an edge
+    is one push, its walk measured from where the first path to reach the region left the player, so the
+    result is not guaranteed optimal (like push-level UCS), in exchange for far fewer nodes.
+    """
+    def __init__(self, level, push_level=False, tie_break=TIE_LOW_H):
+        self.level = level
+        self.push_level = push_level  # expand pushes from the player's region instead of single steps, not optimal
+        self.tie_break = tie_break
+        initial_state = level.initialState()
+        self.initial_state = level.normalize(initial_state) if push_level else initial_state
+        self.goals = level.goals
+        self.weights = level.weights
+        self.matching = MatchingHeuristic(level)  # push-distance tables are built once per level
+        self.nodes = NodePool()
+        self.open_list = BucketQueue(tie_break)  # f -> node index, ties broken by tie_break (g, h, lifo or fifo)
         self.closed_list = set()
         self.nodes_generated = 0
         self.memory_used = 0
@@ -65,11 +85,16 @@ class A_Star_Search:
 
         process = psutil.Process()  # begin to monitor the memory usage
         start_time = time.time()  # begin to monitor the time
-        initial_node = self.initial_state
-        initial_node.h = self.heuristic(initial_node)
+        nodes = self.nodes
+        assignment = self.matching.solve(self.initial_state.stones)
+        if assignment is None:
+            # some stone can never reach a switch, no need to search
+            self.memory_used = process.memory_info().rss / (1024 * 1024)
+            return None, time.time() - start_time
+        root = nodes.add(self.initial_state, 0, assignment.total, assignment=assignment, player=self.level.startPlayer)
 
         # push the initial node to the open list
-        heapq.heappush(self.open_list, (initial_node.f, initial_node))
+        self.open_list.push(nodes.f(root), root, 0)
 
         # maximum allowed search time in seconds (1 minute 30 seconds)
         max_time = 60
@@ -85,146 +110,289 @@ class A_Star_Search:
                 return None, search_time
 
             # pop the node with the smallest f value from the open list
-            _, current_node = heapq.heappop(self.open_list)
-            self.closed_list.add(current_node)
+            _, current = self.open_list.pop()
+            state = nodes.states[current]
+            if state in self.closed_list:
+                continue  # already expanded through a cheaper or equal path
+            self.closed_list.add(state)
 
             # check if the current node is a goal node
-            if self.is_goal(current_node):
+            if self.is_goal(current):
                 end_time = time.time()  
                 search_time = end_time - start_time
                 self.memory_used = process.memory_info().rss / (1024 * 1024)  # get the memory usage in MB
-                solution = self.reconstruct_path(current_node)
+                solution = self.reconstruct_path(current)
                 
                 # return the solution and the search time
                 return solution, search_time 
 
-            # expand the current node
-            neighbors = self.get_neighbors(current_node)
-
-            # add the neighbors to the open list if can be expanded
-            for neighbor in neighbors:
-                if neighbor not in self.closed_list and not self.is_deadlock(neighbor):
-                    neighbor.g = current_node.g + 1
-                    neighbor.h = self.heuristic(neighbor)
-
-                    heapq.heappush(self.open_list, (neighbor.f, neighbor))
-                    self.nodes_generated += 1
+            # expand the current node, add the neighbors to the open list (pushes onto dead squares are never generated)
+            for neighbor in self.get_neighbors(current):
+                self.open_list.push(nodes.f(neighbor), neighbor, nodes.g[neighbor])
+                self.nodes_generated += 1
 
         # return None if no solution is found
         end_time = time.time()
         return None, end_time - start_time
 
-    def get_neighbors(self, node):
-        """the function to get the neighbors of a node"""
-
-        neighbors = []
-        directions = {'u': (-1, 0), 'd': (1, 0), 'l': (0, -1), 'r': (0, 1)}
+    def search_parallel(self, workers=None, max_time=60):
+        """
+        the hash-distributed parallel search (HDA*): state s is owned by worker s.hash % workers, which keeps
+        its open and closed lists and expands it; children are sent to their owners in batches.
+        The best solution reported is optimal once every worker has nothing left below its cost and no batch
+        is in flight, confirmed by two probe waves returning the same balanced message counts.
+        At the time limit (max_time seconds), or as soon as a worker dies, the best solution found so far is
+        returned instead, maybe not optimal; None if its parent chain went down with the dead worker.
+        Returns the move string (None if not found) and the search time
+        """
 
-        for action, (dx, dy) in directions.items():
-            new_ares_pos = (node.ares_position[0] + dx, node.ares_position[1] + dy)
-
-            # Check if Ares can move to the new position
-            if self.is_valid_move(node, new_ares_pos):
-                new_grid = [row[:] for row in node.grid]
-                
-                # Update the old position
-                if node.grid[node.ares_position[0]][node.ares_position[1]] == '+':
-                    new_grid[node.ares_position[0]][node.ares_position[1]] = '.'  # Ares leaving a goal
-                else:
-                    new_grid[node.ares_position[0]][node.ares_position[1]] = ' '  # Ares leaving an empty space
-
-                # Update the new position
-                if new_grid[new_ares_pos[0]][new_ares_pos[1]] == '.':
-                    new_grid[new_ares_pos[0]][new_ares_pos[1]] = '+'  # Ares moves onto a goal
-                else:
-                    new_grid[new_ares_pos[0]][new_ares_pos[1]] = '@'  # Ares moves to an empty space
-
-                new_node = Node(
-                    g=node.g + 1,
-                    h=self.heuristic(node),
-                    ares_position=new_ares_pos,
-                    boxes=node.boxes[:],
-                    grid=new_grid,
-                    parent=node,
-                    action=action
-                )
-                neighbors.append(new_node)
-
-            # Check if Ares can push a stone
-            elif self.is_pushable(node, new_ares_pos, dx, dy):
-                next_pos = (new_ares_pos[0] + dx, new_ares_pos[1] + dy)
-                if self.is_valid_move(node, next_pos):
-                    new_boxes = [next_pos if box == new_ares_pos else box for box in node.boxes]
-                    new_grid = [row[:] for row in node.grid]
-                    
-                    # Update Ares' old position
-                    if node.grid[node.ares_position[0]][node.ares_position[1]] == '+':
-                        new_grid[node.ares_position[0]][node.ares_position[1]] = '.'
-                    else:
-                        new_grid[node.ares_position[0]][node.ares_position[1]] = ' '
+        process = psutil.Process()  # begin to monitor the memory usage
+        start_time = time.time()  # begin to monitor the time
+        workers = workers or os.cpu_count() or 1
+        assignment = self.matching.solve(self.initial_state.stones)
+        if assignment is None or self.level.isSolved(self.initial_state.stones):
+            self.memory_used = process.memory_info().rss / (1024 * 1024)
+            return (None if assignment is None else ''), time.time() - start_time
+
+        inboxes = [multiprocessing.Queue() for _ in range(workers)]
+        results = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=run_parallel_worker, daemon=True,
+                                             args=(self.level, self.push_level, self.tie_break, worker, inboxes, results))
+                     for worker in range(workers)]
+        for worker_process in processes:
+            worker_process.start()
+        root = (self.initial_state, 0, assignment.total, -1, 0, assignment, self.level.startPlayer)
+        inboxes[self.initial_state.hash % workers].put(('nodes', [root]))
+        sent = 1  # batches sent by this process
+
+        incumbent, goal = INFINITY, -1  # best solution cost and its node id (index * workers + worker)
+        wave, replies, previous = 0, None, None
+        finished = failed = False
+        while not finished and time.time() - start_time <= max_time:
+            if not all(worker_process.is_alive() for worker_process in processes):
+                failed = True  # killed, e.g. out of memory: its states are lost and the probes never balance again
+                break
+            if replies is None:
+                wave += 1
+                replies = {}
+                for inbox in inboxes:
+                    inbox.put(('probe', wave))
+            try:
+                message = results.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            if message[0] == 'solution' and message[1] < incumbent:
+                incumbent, goal = message[1], message[2]
+                for inbox in inboxes:
+                    inbox.put(('incumbent', incumbent))
+            elif message[0] == 'status' and message[1] == wave:
+                replies[message[2]] = message[3:]  # (idle, batches sent, batches received)
+                if len(replies) == workers:
+                    counts = [replies[worker] for worker in range(workers)]
+                    balanced = all(idle for idle, _, _ in counts) and sent + sum(c[1] for c in counts) == sum(c[2] for c in counts)
+                    finished = balanced and counts == previous
+                    previous = counts if balanced else None
+                    replies = None
+
+        if not finished:
+            # at the time limit the incumbent, if any, is the best solution found so far
+            reason = "A worker process died. " if failed else "Time limit exceeded. "
+            print(reason + ("Returning the best solution found." if goal >= 0 else "No solution found."))
+        deadline = max(start_time + max_time, time.time()) + PARALLEL_GRACE
+        actions = None
+        if goal >= 0:
+            # follow the parent ids back through the workers that own them
+            path = []
+            node_id = goal
+            while node_id >= 0:
+                owner = node_id % workers
+                inboxes[owner].put(('trace', node_id // workers))
+                message = wait_for_message(results, 'trace', [processes[owner]], deadline)
+                if message is None:
+                    print("The solution's parent chain was lost with its worker.")
+                    break
+                node_id = message[1]
+                if node_id >= 0:
+                    path.append(message[2])
+            else:
+                path.reverse()
+                actions = self.get_moves(path)
+        for inbox in inboxes:
+            inbox.put(('stop',))
+        search_time = time.time() - start_time
+
+        # every live worker reports its node count and memory as it stops, timed out or not
+        memory = process.memory_info().rss
+        alive = [worker_process for worker_process in processes if worker_process.is_alive()]
+        stopped = 0
+        while stopped < len(alive):
+            message = wait_for_message(results, 'stats', alive, deadline)
+            if message is None:
+                break
+            self.nodes_generated += message[1]
+            memory += message[2]
+            stopped += 1
+        for worker_process in processes:
+            worker_process.join(timeout=1)
+            if worker_process.is_alive():
+                worker_process.terminate()
+        self.memory_used = memory / (1024 * 1024)  # all processes together, in MB
+        return actions, search_time
+
+    def search_anytime(self, initial_weight=3.0, weight_step=0.5, on_solution=None):
+        """
+        the anytime search (ARA*): weighted A* with f = g + weight * h finds a first solution fast,
+        then the weight is lowered step by step down to 1, reusing every g value found so far.
+        Each pass publishes its best solution and a bound on how far from optimal it can be
+        (on_solution(actions, cost, bound) and self.solutions); at the time limit the best one is returned.
+        """
 
-                    # Update stone's old position and Ares' new position
-                    if new_grid[new_ares_pos[0]][new_ares_pos[1]] == '*':
-                        new_grid[new_ares_pos[0]][new_ares_pos[1]] = '+'  # Ares moves to goal after pushing stone
+        process = psutil.Process()  # begin to monitor the memory usage
+        start_time = time.time()  # begin to monitor the time
+        max_time = 60
+        nodes = self.nodes
+        self.solutions = []  # (cost, bound, time in ms) of every published solution
+        self.bound = INFINITY
+        assignment = self.matching.solve(self.initial_state.stones)
+        if assignment is None:
+            self.memory_used = process.memory_info().rss / (1024 * 1024)
+            return None, time.time() - start_time
+        root = nodes.add(self.initial_state, 0, assignment.total, assignment=assignment, player=self.level.startPlayer)
+        if self.is_goal(root):
+            self.bound = 1
+            self.memory_used = process.memory_info().rss / (1024 * 1024)
+            return self.reconstruct_path(root), time.time() - start_time
+
+        best = {self.initial_state: root}  # state -> node holding its cheapest known g
+        incumbent, incumbent_cost = None, INFINITY
+        weight = initial_weight
+        open_list = [(weight * nodes.h[root], nodes.h[root], root)]  # float keys, so a plain heap
+        inconsistent = []  # nodes improved after their state was expanded in the current pass
+        timed_out = False
+
+        while True:
+            # improve the incumbent: expand while some key can still beat it
+            closed = set()
+            while open_list and open_list[0][0] < incumbent_cost:
+                if time.time() - start_time > max_time:
+                    timed_out = True
+                    break
+                _, _, current = heapq.heappop(open_list)
+                state = nodes.states[current]
+                if best[state] != current or state in closed:
+                    continue  # superseded by a cheaper node of the same state
+                closed.add(state)
+                g = nodes.g[current]
+                for new_state, cost, action, new_assignment, player in self.get_successors(current):
+                    new_g = g + cost
+                    previous = best.get(new_state)
+                    if previous is not None and nodes.g[previous] <= new_g:
+                        continue
+                    neighbor = nodes.add(new_state, new_g, new_assignment.total, current, action, new_assignment, player)
+                    best[new_state] = neighbor
+                    self.nodes_generated += 1
+                    if self.is_goal(neighbor):
+                        if new_g < incumbent_cost:
+                            incumbent, incumbent_cost = neighbor, new_g
+                    elif new_state in closed:
+                        inconsistent.append(neighbor)
                     else:
-                        new_grid[new_ares_pos[0]][new_ares_pos[1]] = '@'  # Ares moves to empty space after pushing stone
+                        heapq.heappush(open_list, (new_g + weight * nodes.h[neighbor], nodes.h[neighbor], neighbor))
+
+            # the optimal cost is at least the smallest g + h still waiting
+            pending = [index for _, _, index in open_list if best[nodes.states[index]] == index]
+            pending += [index for index in inconsistent if best[nodes.states[index]] == index]
+            lower = min((nodes.f(index) for index in pending), default=incumbent_cost)
+            if incumbent is not None:
+                bound = incumbent_cost / lower if lower > 0 else INFINITY
+                if not timed_out:
+                    bound = min(bound, weight)  # a finished pass is within its weight of optimal
+                self.bound = max(1, min(self.bound, bound))
+                elapsed = (time.time() - start_time) * 1000
+                if not self.solutions or self.solutions[-1][:2] != (incumbent_cost, self.bound):
+                    self.solutions.append((incumbent_cost, self.bound, elapsed))
+                    print(f"Solution of cost {incumbent_cost} within {self.bound:.2f}x of optimal after {elapsed:.2f} ms")
+                    if on_solution is not None:
+                        on_solution(self.get_actions(incumbent), incumbent_cost, self.bound)
+            if timed_out or weight <= 1 or self.bound <= 1 or not pending:
+                break
+
+            # next pass: lower the weight and requeue everything still open or inconsistent
+            weight = max(1, weight - weight_step)
+            open_list = [(nodes.g[index] + weight * nodes.h[index], nodes.h[index], index) for index in set(pending)]
+            heapq.heapify(open_list)
+            inconsistent = []
+
+        self.memory_used = process.memory_info().rss / (1024 * 1024)  # get the memory usage in MB
+        if incumbent is None:
+            print("Time limit exceeded. No solution found." if timed_out else "No solution found.")
+            return None, time.time() - start_time
+        return self.reconstruct_path(incumbent), time.time() - start_time
 
-                    # Update stone's new position
-                    if new_grid[next_pos[0]][next_pos[1]] == '.':
-                        new_grid[next_pos[0]][next_pos[1]] = '*'  # Stone moves to goal
-                    else:
-                        new_grid[next_pos[0]][next_pos[1]] = '$'  # Stone moves to empty space
-
-                    new_node = Node(
-                        g=node.g + 1,
-                        h=self.heuristic(node),
-                        ares_position=new_ares_pos,
-                        boxes=new_boxes,
-                        grid=new_grid,
-                        parent=node,
-                        action=action.upper()
-                    )
-                    neighbors.append(new_node)
+    def get_neighbors(self, node):
+        """the function to add the unexpanded neighbors of a node to the pool and return their indices"""
 
+        nodes = self.nodes
+        g = nodes.g[node]
+        neighbors = []
+        for new_state, cost, action, assignment, player in self.get_successors(node):
+            if new_state not in self.closed_list:
+                neighbors.append(nodes.add(new_state, g + cost, assignment.total, node, action, assignment, player))
         return neighbors
 
-    def is_valid_position(self, position, grid):
-        """the function to check if a position is valid"""
-
-        rows, cols = len(grid), len(grid[0])
-        row, col = position
-        return 0 <= row < rows and 0 <= col < cols and grid[row][col] != '#'
-
-    def is_deadlock(self, node):
-        """the function to check if a node is a deadlock"""
-
-        for box in node.boxes:
-            if not self.is_valid_position(box, node.grid):
-                return True
-            if self.is_cornered(box, node.grid) and box not in self.goals:
-                return True
-        return False
-
-    def is_cornered(self, box, grid):
-        """Check if a box is cornered"""
-
-        x, y = box
-        if (grid[x-1][y] == '#' or grid[x+1][y] == '#') and (grid[x][y-1] == '#' or grid[x][y+1] == '#'):
-            return True
-        return False
+    def get_successors(self, node):
+        """the function to yield (state, edge cost, action code, assignment, player cell) for every live successor of a node"""
+
+        if self.push_level:
+            yield from self.get_push_successors(node)
+            return
+
+        nodes = self.nodes
+        parent_assignment = nodes.assignments[node]
+        for action, new_state, pushed_index in self.level.successors(nodes.states[node]):
+            if pushed_index < 0:
+                # a walk moves no stone, so the parent's estimate still holds
+                yield new_state, 1, ord(action), parent_assignment, new_state.player
+                continue
+            assignment = self.matching.update(parent_assignment, new_state.stones, pushed_index)
+            if assignment is None:
+                continue  # some stone can no longer reach any free switch
+            yield new_state, 1 + self.weights[pushed_index], ord(action), assignment, new_state.player  # a push also costs the stone's weight
+
+    def get_push_successors(self, node):
+        """the function to yield the push-level successors of a node (one push each, walking included in the cost)"""
+
+        nodes = self.nodes
+        parent_assignment = nodes.assignments[node]
+        state = nodes.states[node]
+        for push, walk_steps, pushes, new_state in self.level.pushSuccessors(state, nodes.players[node]):
+            index, direction = push
+            assignment = self.matching.update(parent_assignment, new_state.stones, index)
+            if assignment is None:
+                continue
+            player = self.level.pushedPlayer(push, new_state.stones, state.stones)
+            yield new_state, walk_steps + pushes * (1 + self.weights[index]), index * 4 + direction, assignment, player
+
+    def get_actions(self, node):
+        """the function to get the move string from the root node to the current node"""
+
+        path = self.reconstruct_path(node)[1:]
+        return self.get_moves([self.nodes.actions[index] for index in path])
+
+    def get_moves(self, actions):
+        """the function to turn the action codes along a root-to-node path into the move string"""
+
+        if not self.push_level:
+            return ''.join(chr(action) for action in actions)
+        return self.level.expandPushes(divmod(action, 4) for action in actions)
 
     def is_goal(self, node):
         """the function to check if a node is a goal"""
-        return all(box in self.goals for box in node.boxes)
+        return self.level.isSolved(self.nodes.states[node].stones)
 
     def reconstruct_path(self, node):
-        """the function to reconstruct the path from the root node to the current node"""
-
-        path = []
-        while node:
-            path.append(node)
-            node = node.parent
-        return path[::-1]
+        """the function to reconstruct the node indices from the root node to the current node"""
+        return self.nodes.get_path(node)
 
     def print_result(self, solution, steps, search_time):
         """the function to print the result"""
@@ -235,47 +403,123 @@ class A_Star_Search:
         for step in solution:
             print(step)
         return solution
-
-    def is_pushable(self, node, pos, dx, dy):
-        """the function to check if a stone is pushable"""
-
-        next_pos = (pos[0] + dx, pos[1] + dy)
-        return pos in node.boxes and self.is_valid_move(node, next_pos)
-
-    def is_valid_move(self, node, pos):
-        """the function to check if a move is valid"""
-
-        return node.grid[pos[0]][pos[1]] in [' ', '.']
-
-
-    def heuristic(self, node):
-        """the function to calculate the heuristic value of a node"""
-
-        total_distance = 0
-        for box in node.boxes:
-            min_distance = min(abs(box[0] - goal[0]) + abs(box[1] - goal[1]) for goal in self.goals)
-            total_distance += min_distance * self.weights[node.boxes.index(box)]
-        return total_distance
 #=======================================================================================================
 #=========================================== END CLASS: A_Star_Search ==================================   
 
 
+# class HDA_Star_Worker: one process of the parallel search
 #=======================================================================================================
-#=========================================== GLOBAL FUNCTION  ==========================================
-def read_input_file(filename):
-    """the function to read the input file"""
+#=========================================== BEGIN CLASS: HDA_Star_Worker ==============================
+class HDA_Star_Worker:
+    def __init__(self, level, push_level, tie_break, worker, inboxes, results):
+        self.search = A_Star_Search(level, push_level, tie_break)  # this worker's pool and open list
+        self.worker = worker
+        self.workers = len(inboxes)
+        self.inboxes = inboxes
+        self.results = results
+        self.best = {}  # owned state -> node holding its cheapest known g
+        self.outgoing = [[] for _ in inboxes]  # children waiting to be sent to each owner
+        self.incumbent = INFINITY
+        self.sent = 0
+        self.received = 0
+
+    def receive(self, entry):
+        """the function to add a node (state, g, h, parent id, action, assignment, player cell) if it improves its state"""
+
+        state, g, h, parent, action, assignment, player = entry
+        search = self.search
+        nodes = search.nodes
+        previous = self.best.get(state)
+        if g + h >= self.incumbent or (previous is not None and nodes.g[previous] <= g):
+            return
+        node = nodes.add(state, g, h, parent, action, assignment, player)
+        self.best[state] = node
+        search.nodes_generated += 1
+        if search.is_goal(node):
+            self.incumbent = g
+            self.results.put(('solution', g, node * self.workers + self.worker))
+        else:
+            search.open_list.push(g + h, node, g)
+
+    def expand(self, limit):
+        """the function to expand up to `limit` of the best owned nodes"""
+
+        search = self.search
+        nodes = search.nodes
+        for _ in range(limit):
+            if not search.open_list:
+                return
+            f, node = search.open_list.pop()
+            if f >= self.incumbent:
+                search.open_list = BucketQueue(search.tie_break)  # nothing left can beat the incumbent
+                return
+            if self.best[nodes.states[node]] != node:
+                continue  # superseded by a cheaper node of the same state
+            g = nodes.g[node]
+            node_id = node * self.workers + self.worker
+            for new_state, cost, action, assignment, player in search.get_successors(node):
+                entry = (new_state, g + cost, assignment.total, node_id, action, assignment, player)
+                owner = new_state.hash % self.workers
+                if owner == self.worker:
+                    self.receive(entry)
+                else:
+                    self.outgoing[owner].append(entry)
+
+    def flush(self):
+        """the function to send every pending batch of children to its owner"""
+
+        for owner, batch in enumerate(self.outgoing):
+            if batch:
+                self.inboxes[owner].put(('nodes', batch))
+                self.outgoing[owner] = []
+                self.sent += 1
+
+    def run(self):
+        """the worker loop: handle every queued message, expand a few nodes, send their children"""
+
+        inbox = self.inboxes[self.worker]
+        nodes = self.search.nodes
+        while True:
+            try:
+                message = inbox.get_nowait() if self.search.open_list else inbox.get(timeout=0.1)
+            except queue.Empty:
+                message = None
+            while message is not None:
+                if message[0] == 'nodes':
+                    self.received += 1
+                    for entry in message[1]:
+                        self.receive(entry)
+                elif message[0] == 'incumbent':
+                    self.incumbent = min(self.incumbent, message[1])
+                elif message[0] == 'probe':
+                    self.flush()
+                    self.results.put(('status', message[1], self.worker, not self.search.open_list, self.sent, self.received))
+                elif message[0] == 'trace':
+                    self.results.put(('trace', nodes.parents[message[1]], nodes.actions[message[1]]))
+                elif message[0] == 'stop':
+                    self.results.put(('stats', self.search.nodes_generated, psutil.Process().memory_info().rss))
+                    for other in self.inboxes:
+                        other.cancel_join_thread()  # unread batches must not keep this process alive
+                    return
+                try:
+                    message = inbox.get_nowait()
+                except queue.Empty:
+                    message = None
+            self.expand(PARALLEL_BATCH)
+            self.flush()
+#=======================================================================================================
+#=========================================== END CLASS: HDA_Star_Worker ================================
 
-    with open(filename, 'r') as file:
-        weights = list(map(int, file.readline().strip().split()))
-        grid = [list(line.strip()) for line in file]
-    return weights, grid
 
-def write_output_file(filename, algorithm_name, steps, total_weight, nodes_generated, search_time, memory_used, actions):
-    """the function to write the output file"""
+#=======================================================================================================
+#=========================================== GLOBAL FUNCTION  ==========================================
+def write_output_file(filename, algorithm_name, steps, total_weight, nodes_generated, search_time, memory_used, actions, bound=None):
+    """the function to write the output file (bound: suboptimality bound of an anytime solution)"""
 
     with open(filename, 'a') as file:
         file.write(f"{algorithm_name}\n")
-        file.write(f"Steps: {steps}, Weight: {total_weight}, Nodes: {nodes_generated}, Time (ms): {search_time:.2f}, Memory (MB): {memory_used:.2f}\n")
+        file.write(f"Steps: {steps}, Weight: {total_weight}, Nodes: {nodes_generated}, Time (ms): {search_time:.2f}, Memory (MB): {memory_used:.2f}")
+        file.write(f", Bound: {bound:.2f}\n" if bound is not None else "\n")
         file.write(f"{actions}\n")
 
 def print_result(actions, steps, search_time, goals):
@@ -286,87 +530,43 @@ def print_result(actions, steps, search_time, goals):
     for i, step in enumerate(actions):
         print(f"{i + 1}. {step}")
 
-def create_initial_state(grid):
-    """the function to create the initial state"""
-
-    ares_position = None
-    stone_positions = []
-    goals = []
-
-    for row in range(len(grid)):
-        for col in range(len(grid[row])):
-            if grid[row][col] in ['@', '+']:
-                ares_position = (row, col)
-            if grid[row][col] in ['$','*']:
-                stone_positions.append((row, col))
-            if grid[row][col] in ['.', '*', '+']:
-                goals.append((row, col))
-    
-    return ares_position, stone_positions, goals
-
-
-def move_position(x, y, direction):
-    """the function to move the position"""
-
-    if direction == 'u':
-        return x - 1, y
-    elif direction == 'd':
-        return x + 1, y
-    elif direction == 'l':
-        return x, y - 1
-    elif direction == 'r':
-        return x, y + 1
-    return x, y
-
-def calculate_total_cost(final_path, ares_position, stone_weights, stones):
-    """the function to calculate the total cost of the solution"""
-
-    total_cost = 0
-    current_x, current_y = ares_position 
-    stone_positions = stones.copy()  
-
-    for action in final_path:
-        # if the action is a move action
-        if action in ['u', 'd', 'l', 'r']:  
-            new_x, new_y = move_position(current_x, current_y, action)
-        #     total_cost += 1  
-            current_x, current_y = new_x, new_y  
-        
-        # if the action is a push action
-        if action in ['U', 'D', 'L', 'R']:
-            # get the direction of the stone 
-            stone_direction = action.lower()  
-            stone_x, stone_y = move_position(current_x, current_y, stone_direction) 
-            
-            # get the weight of the stone
-            stone_weight = stone_weights[stone_positions.index((stone_x, stone_y))]
-            total_cost +=  stone_weight  
-            
-            # update the position of the stone
-            new_stone_x, new_stone_y = move_position(stone_x, stone_y, stone_direction)
-            stone_positions[stone_positions.index((stone_x, stone_y))] = (new_stone_x, new_stone_y)
+def wait_for_message(results, kind, senders, deadline):
+    """the function to read results until a `kind` message, None once every sender died or the deadline passed"""
 
-            # update the position of Ares
-            current_x, current_y = stone_x, stone_y
+    while True:
+        try:
+            message = results.get(timeout=max(0.01, min(0.1, deadline - time.time())))
+            if message[0] == kind:
+                return message
+        except queue.Empty:
+            if time.time() > deadline or not any(sender.is_alive() for sender in senders):
+                return None
 
-    return total_cost
+def run_parallel_worker(level, push_level, tie_break, worker, inboxes, results):
+    """the function run in each process of A_Star_Search.search_parallel"""
+    HDA_Star_Worker(level, push_level, tie_break, worker, inboxes, results).run()
 
-def remake_output(test_case):
+def remake_output(test_case, push_level=False, anytime=False, parallel=0):
     input_filename = f'Test_cases/input-{test_case}.txt'
     output_filename = f'Outputs/output-{test_case}.txt'
 
-    weights, grid = read_input_file(input_filename)
-    ares_position, stone_positions, goals = create_initial_state(grid)
-    initial_node = Node(ares_position=ares_position, boxes=stone_positions, grid=grid)
-    
-    search_algorithm = A_Star_Search(initial_node, goals, weights)
-    solution_node, search_time = search_algorithm.search()  
+    level = Level.fromFile(input_filename)
+    search_algorithm = A_Star_Search(level, push_level)
+    if parallel:
+        # hash-distributed over `parallel` processes, the moves come back already rebuilt
+        actions, search_time = search_algorithm.search_parallel(parallel)
+        solution_node = actions
+    elif anytime:
+        # the best solution found before the time limit is written, with its suboptimality bound
+        solution_node, search_time = search_algorithm.search_anytime()
+    else:
+        solution_node, search_time = search_algorithm.search()  
     
     if solution_node is not None:
-        final_node = solution_node[-1]  
-        steps = final_node.g
-        total_weight = calculate_total_cost(final_node.get_path(), ares_position, weights, stone_positions)
-        actions = final_node.get_path() 
+        if not parallel:
+            final_node = solution_node[-1]  
+            actions = search_algorithm.get_actions(final_node)
+        steps, total_weight = level.pathCost(actions)
             
     else:
         actions = "No solution"
@@ -376,37 +576,15 @@ def remake_output(test_case):
     search_time = search_time * 1000 
     # print_result(actions, steps, search_time, goals) # print the result to the console
     
-    write_output_file(output_filename, "A*", steps, total_weight, search_algorithm.nodes_generated, search_time, search_algorithm.memory_used, actions)
+    bound = search_algorithm.bound if anytime and solution_node is not None else None
+    # push-level solutions are not guaranteed optimal, so they are not labelled as plain A*
+    algorithm_name = "A* (push-level, not optimal)" if push_level else "A*"
+    write_output_file(output_filename, algorithm_name, steps, total_weight, search_algorithm.nodes_generated, search_time, search_algorithm.memory_used, actions, bound)
         
 
 def main():
     for i in range(1, 11):
-        # print(i)
-        input_filename = f'Test_cases/input-{i}.txt'
-        output_filename = f'Outputs/output-{i}.txt'
-        weights, grid = read_input_file(input_filename)
-        
-        ares_position, stone_positions, goals = create_initial_state(grid)
-        initial_node = Node(ares_position=ares_position, boxes=stone_positions, grid=grid)
-        
-        search_algorithm = A_Star_Search(initial_node, goals, weights)
-        solution_node, search_time = search_algorithm.search()  
-        
-        if solution_node is not None:
-            final_node = solution_node[-1]  
-            steps = final_node.g
-            total_weight = calculate_total_cost(final_node.get_path(), ares_position, weights, stone_positions)
-            actions = final_node.get_path() 
-             
-        else:
-            actions = "No solution"
-            steps = 0
-            total_weight = 0
-
-        search_time = search_time * 1000 
-        # print_result(actions, steps, search_time, goals) # print the result to the console
-        
-        write_output_file(output_filename, "A*", steps, total_weight, search_algorithm.nodes_generated, search_time, search_algorithm.memory_used, actions)
+        remake_output(i)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,143 +1,583 @@
+import os
+import mmap
 import time
+import heapq
+import shutil
 import psutil
+import tempfile
+import multiprocessing
+from array import array
+from bisect import bisect_left
 from collections import deque, namedtuple
+from multiprocessing import shared_memory
+from Modules.Engine import Level
 
-# Define directions and their actions
-DIRECTIONS = {'u': (-1, 0), 'd': (1, 0), 'l': (0, -1), 'r': (0, 1)}
-PUSH_DIRECTIONS = {'U': (-1, 0), 'D': (1, 0), 'L': (0, -1), 'R': (0, 1)}
+# Define the State structure: `node` indexes the parent/move tables the path is rebuilt from
+State = namedtuple("State", ["key", "node", "steps", "weight"])
 
-# Define the State structure
-State = namedtuple("State", ["ares_pos", "stones", "path", "steps", "weight"])
+# Layered parallel BFS
+TABLE_BITS = 20  # initial visited table size as a power of two, doubled before it gets over half full
+PARALLEL_LAYER = 512  # smaller layers are expanded in the main process, the pool costs more than it saves
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15  # Fibonacci hashing of the packed keys
+
+# External-memory BFS
+RECORD_BUFFER = 1 << 20  # packed keys held in RAM before they are sorted and spilled to disk as a run
+DUPLICATE_LAYERS = None  # earlier layers each new layer is checked against, None for all of them (needed to terminate)
+
+class SharedVisitedTable:
+    """
+    Open-addressing set of packed state keys (Level.packState) in shared memory, probed linearly.
+    Slots hold key + 1 so that 0 marks an empty slot. Only the main process adds keys, between layers;
+    the workers attach to it by name and only read it while a layer is expanded.
+    """
+    def __init__(self, capacity_bits, name=None):
+        self.capacity_bits = capacity_bits
+        self.capacity = 1 << capacity_bits
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=8 * self.capacity)
+            self.memory.buf[:] = bytes(8 * self.capacity)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.slots = self.memory.buf.cast('Q')
+        self.count = 0
+
+    def first_slot(self, key):
+        return ((key * HASH_MULTIPLIER) & 0xFFFFFFFFFFFFFFFF) >> (64 - self.capacity_bits)
+
+    def contains(self, key):
+        slots = self.slots
+        stored = key + 1
+        slot = self.first_slot(key)
+        while True:
+            value = slots[slot]
+            if value == stored:
+                return True
+            if not value:
+                return False
+            slot = (slot + 1) & (self.capacity - 1)
+
+    def add(self, key):
+        slots = self.slots
+        stored = key + 1
+        slot = self.first_slot(key)
+        while True:
+            value = slots[slot]
+            if value == stored:
+                return
+            if not value:
+                slots[slot] = stored
+                self.count += 1
+                return
+            slot = (slot + 1) & (self.capacity - 1)
+
+    def grown(self):
+        """the function to move every key into a table twice as large, freeing this one"""
+        table = SharedVisitedTable(self.capacity_bits + 1)
+        for value in self.slots:
+            if value:
+                table.add(value - 1)
+        self.close(unlink=True)
+        return table
+
+    def close(self, unlink=False):
+        self.slots.release()
+        self.memory.close()
+        if unlink:
+            self.memory.unlink()
+
+def expand_keys(level, table, keys, first):
+    """
+    Expand the packed keys of a frontier slice starting at position `first`, returns the children not in
+    the visited table as (keys, parent positions, move bytes, solved keys)
+    """
+    children = array('Q')
+    parents = array('I')
+    moves = bytearray()
+    solved = []
+    for position, key in enumerate(keys, first):
+        for move, child, stone_index in level.successors(level.unpackState(key)):
+            child_key = level.packState(child.player, child.stones)
+            if table.contains(child_key):
+                continue
+            if stone_index >= 0 and level.isSolved(child.stones):
+                solved.append(child_key)
+            children.append(child_key)
+            parents.append(position)
+            moves.append(ord(move))
+    return children, parents, moves, solved
+
+# state of a layer worker process, set once by the pool initializer
+worker_level = None
+worker_table = None
+
+def init_layer_worker(level):
+    global worker_level
+    worker_level = level
+
+def expand_layer_chunk(task):
+    """the function run by a pool worker on one slice of a layer, attaching to the current visited table"""
+    global worker_table
+    table_name, table_bits, keys, first = task
+    if worker_table is None or worker_table.memory.name != table_name:
+        if worker_table is not None:
+            worker_table.close()
+        worker_table = SharedVisitedTable(table_bits, table_name)
+    return expand_keys(worker_level, worker_table, keys, first)
+
+class LayerFile:
+    """
+    Sorted, distinct packed keys stored on disk as fixed-width big-endian records, so that the byte order
+    of the records is their numeric order. Written once front to back, then read through a memory map.
+    """
+    def __init__(self, path, width):
+        self.path = path
+        self.width = width
+        self.count = 0
+        self.file = open(path, 'wb')
+        self.memory = None
+
+    def append(self, key):
+        self.file.write(key.to_bytes(self.width, 'big'))
+        self.count += 1
+
+    def finish(self):
+        self.file.close()
+        if self.count:
+            with open(self.path, 'rb') as f:
+                self.memory = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        if self.memory is not None:
+            self.memory.close()
+            self.memory = None
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, position):
+        start = position * self.width
+        return int.from_bytes(self.memory[start:start + self.width], 'big')
+
+    def __iter__(self):
+        for position in range(self.count):
+            yield self[position]
+
+def merge_distinct(runs):
+    """the function to merge sorted runs into one sorted stream without repeats"""
+    previous = None
+    for key in heapq.merge(*runs):
+        if key != previous:
+            yield key
+            previous = key
+
+def without_seen(keys, layers):
+    """the function to drop from a sorted stream every key of the sorted layers, walking them all once"""
+    iterators = [iter(layer) for layer in layers]
+    heads = [next(keys_left, None) for keys_left in iterators]
+    for key in keys:
+        for position, keys_left in enumerate(iterators):
+            while heads[position] is not None and heads[position] < key:
+                heads[position] = next(keys_left, None)
+        if key not in heads:
+            yield key
 
 class MazeSolver:
-    def __init__(self, input_file, output_file):
+    def __init__(self, input_file, output_file, push_level=False, bidirectional=False, workers=0, external=False):
         self.input_file = input_file
         self.output_file = output_file
+        self.push_level = push_level  # search over pushes instead of single steps
+        self.bidirectional = bidirectional  # also search backwards by pulling stones off the switches
+        self.workers = workers  # processes sharing each BFS layer, 0 for the single-process search
+        self.external = external  # keep the layers on disk instead of a visited set in RAM
+        self.parents = array('i', [-1])  # parent node of every generated node, the root has none
+        self.moves = ['']  # move (or push) leading to every generated node
         self.parse_input()
 
     def parse_input(self):
-        with open(self.input_file, 'r') as f:
-            # Parse weights
-            self.stone_weights = list(map(int, f.readline().strip().split()))
-
-            # Parse the grid
-            self.grid = []
-            for line in f:
-                if line.strip():  # Bỏ qua dòng trống nếu có
-                    self.grid.append(list(line.rstrip()))
-
-            # Lấy kích thước thực tế của lưới
-            self.n = len(self.grid)
-            self.m = max(len(row) for row in self.grid) if self.grid else 0
-
-        # Khởi tạo danh sách và tập hợp cho các đối tượng
-        self.stones = []
-        self.switches = set()
-        self.ares_pos = None
-
-        # Duyệt qua từng hàng và cột trong lưới
-        for i in range(self.n):
-            for j in range(len(self.grid[i])):  # Sử dụng độ dài thực tế của dòng `i`
-                if self.grid[i][j] == '@':
-                    self.ares_pos = (i, j)
-                elif self.grid[i][j] == '$':
-                    self.stones.append((i, j))
-                elif self.grid[i][j] == '.':
-                    self.switches.add((i, j))
-                elif self.grid[i][j] == '*':
-                    self.switches.add((i, j))
-                    self.stones.append((i, j))
+        # Walls, switches and the flattened cell index are encoded once in the shared level
+        self.level = Level.fromFile(self.input_file)
+        self.stone_weights = self.level.weights
+
+    def add_node(self, parent, move):
+        self.parents.append(parent)
+        self.moves.append(move)
+        return len(self.moves) - 1
+
+    def rebuild_path(self, node):
+        # Follow the parent links back to the root, only done once a goal is reached
+        moves = []
+        while node > 0:
+            moves.append(self.moves[node])
+            node = self.parents[node]
+        moves.reverse()
+        return moves
         
     def bfs(self):
+        if self.push_level:
+            return self.bfs_pushes()
+        if self.bidirectional and len(self.level.goals) == len(self.stone_weights):
+            return self.bfs_bidirectional()
+        if self.external:
+            return self.bfs_external()
+        if self.workers > 0 and self.level.keyBits <= 63:
+            # keys too wide for a 64-bit table slot keep the single-process search
+            return self.bfs_layered()
+
         start_time = time.time()
-        initial_state = State(self.ares_pos, tuple(self.stones), '', 0, 0)
+        initial_state = State(self.level.initialState(), 0, 0, 0)
+        if self.is_goal(initial_state):
+            return self.generate_output(initial_state, '', 1, start_time)
+
         queue = deque([initial_state])
-        visited = set()
-        visited.add((initial_state.ares_pos, initial_state.stones))
+        visited = set()  # engine states, hashed incrementally by the level
+        visited.add(initial_state.key)
         nodes_generated = 1
 
         while queue:
              # Check for timeout
             time_out = 60 # 60 giây
             if time.time() - start_time > time_out:
-                state = state._replace(path="No solution\n")
-                return self.generate_output(state, nodes_generated, start_time)  # Terminate if timeout is exceeded
+                return self.generate_output(state, "No solution\n", nodes_generated, start_time)  # Terminate if timeout is exceeded
             
             state = queue.popleft()
-            if self.is_goal(state):
-                return self.generate_output(state, nodes_generated, start_time)
-
-            # Try moving in each direction
-            for move, (dx, dy) in DIRECTIONS.items():
-                new_ares_pos = (state.ares_pos[0] + dx, state.ares_pos[1] + dy)
-                
-                # Normal movement check
-                if self.is_valid_move(new_ares_pos, state.stones):
-                    new_state = State(new_ares_pos, state.stones, state.path + move, state.steps + 1, state.weight)
-                    if (new_state.ares_pos, new_state.stones) not in visited:
-                        queue.append(new_state)
-                        visited.add((new_state.ares_pos, new_state.stones))
-                        nodes_generated += 1
 
-                # Try pushing stones if Ares is on a stone
-                if new_ares_pos in state.stones:
-                    push_dir = move.upper()  # Convert move to upper case for pushing
-                    new_stone_pos = (new_ares_pos[0] + dx, new_ares_pos[1] + dy)
-
-                    # Valid push check
-                    if self.is_valid_push(new_ares_pos, new_stone_pos, state.stones):
-                        stone_index = state.stones.index(new_ares_pos)
-                        new_stones = list(state.stones)
-                        new_stones[stone_index] = new_stone_pos
-                        new_weight = state.weight + self.stone_weights[stone_index]
-                        new_state = State(new_ares_pos, tuple(new_stones), state.path + push_dir, state.steps + 1, new_weight)
-
-                        if (new_state.ares_pos, new_state.stones) not in visited:
-                            queue.append(new_state)
-                            visited.add((new_state.ares_pos, new_state.stones))
-                            nodes_generated += 1
-
-                            # Kiểm tra mục tiêu sau khi đẩy
-                            if self.is_goal(new_state):
-                                return self.generate_output(new_state, nodes_generated, start_time)
+            # Try moving (or pushing) in each direction
+            for move, new_key, stone_index in self.level.successors(state.key):
+                if new_key in visited:
+                    continue
+                new_weight = state.weight if stone_index < 0 else state.weight + self.stone_weights[stone_index]
+                new_state = State(new_key, self.add_node(state.node, move), state.steps + 1, new_weight)
+                queue.append(new_state)
+                visited.add(new_key)
+                nodes_generated += 1
+
+                # Kiểm tra mục tiêu sau khi đẩy
+                if stone_index >= 0 and self.is_goal(new_state):
+                    path = ''.join(self.rebuild_path(new_state.node))
+                    return self.generate_output(new_state, path, nodes_generated, start_time)
                             
-        state = state._replace(path="No solution")
-        return self.generate_output(state, nodes_generated, start_time)   # No solution found
+        return self.generate_output(state, "No solution", nodes_generated, start_time)   # No solution found
 
-    def is_goal(self, state):
-        # Kiểm tra tất cả các vị trí stone hiện tại có nằm trên các switch không
-        return all(stone in self.switches for stone in state.stones)
+    def bfs_pushes(self):
+        """
+        Push-level BFS: a node is the stone layout plus the canonical cell of the player's region,
+        its successors are the pushes reachable from that region. Nodes record their (stone, direction)
+        push, turned into the move string once a goal is found. A tunnel or goal room macro counts as
+        one node however many pushes it makes, so the result has the fewest such moves: it is neither
+        push-optimal nor step-optimal.
+        """
+        start_time = time.time()
+        level = self.level
+        initial_key = level.normalize(level.initialState())
+        initial_state = State(initial_key, 0, 0, 0)
+        if self.is_goal(initial_state):
+            return self.generate_output(initial_state, '', 1, start_time)
+
+        queue = deque([(initial_state, level.startPlayer)])
+        visited = {initial_key}
+        nodes_generated = 1
+        time_out = 60
+
+        while queue:
+            if time.time() - start_time > time_out:
+                return self.generate_output(State(None, 0, 0, 0), "No solution", nodes_generated, start_time)
+
+            state, player = queue.popleft()
+            for push, _, _, new_key in level.pushSuccessors(state.key, player):
+                if new_key in visited:
+                    continue
+                visited.add(new_key)
+                nodes_generated += 1
+                new_state = State(new_key, self.add_node(state.node, push), state.steps + 1, 0)
+                if self.is_goal(new_state):
+                    path = level.expandPushes(self.rebuild_path(new_state.node))
+                    steps, weight = level.pathCost(path)
+                    return self.generate_output(State(new_key, new_state.node, steps, weight), path, nodes_generated, start_time)
+                queue.append((new_state, level.pushedPlayer(push, new_key.stones, state.key.stones)))
+
+        return self.generate_output(State(None, 0, 0, 0), "No solution", nodes_generated, start_time)
+
+    def bfs_bidirectional(self):
+        """
+        Step-level BFS from both ends: forward moves from the start and backward pulls from every
+        solved layout, whose player stands next to a switch (the last move is always a push).
+        Both sides key states on the player and the sorted stone cells, since which stone sits where
+        does not change the moves. A whole layer of the smaller frontier is expanded at a time and the
+        shortest meeting found in it is optimal; the path is the forward moves followed by the moves
+        undone by the backward side, with the weight replayed from the path.
+        """
+        start_time = time.time()
+        level = self.level
+        initial_key = level.initialState()
+        if self.is_goal(State(initial_key, 0, 0, 0)):
+            return self.generate_output(State(initial_key, 0, 0, 0), '', 1, start_time)
+
+        forward = {(initial_key.player, tuple(sorted(initial_key.stones))): (0, 0)}  # key -> (node, steps)
+        forward_layer = [State(initial_key, 0, 0, 0)]
+        goal_stones = tuple(sorted(level.goals))
+        backward = {}  # key -> (key one move closer to the goal, that move, moves left)
+        for goal in level.goals:
+            for offset in level.offsets:
+                player = goal - offset
+                if level.floor[player] and not level.isGoal[player]:
+                    backward[(player, goal_stones)] = (None, '', 0)
+        backward_layer = list(backward)
+        nodes_generated = 1 + len(backward)
+        time_out = 60
+
+        while forward_layer and backward_layer:
+            best = None  # (length, meeting key)
+            if len(forward_layer) <= len(backward_layer):
+                next_layer = []
+                for state in forward_layer:
+                    if time.time() - start_time > time_out:
+                        return self.generate_output(State(None, 0, 0, 0), "No solution", nodes_generated, start_time)
+                    for move, new_key, _ in level.successors(state.key):
+                        meeting = (new_key.player, tuple(sorted(new_key.stones)))
+                        if meeting in forward:
+                            continue
+                        new_state = State(new_key, self.add_node(state.node, move), state.steps + 1, 0)
+                        forward[meeting] = (new_state.node, new_state.steps)
+                        next_layer.append(new_state)
+                        nodes_generated += 1
+                        if meeting in backward:
+                            length = new_state.steps + backward[meeting][2]
+                            if best is None or length < best[0]:
+                                best = (length, meeting)
+                forward_layer = next_layer
+            else:
+                next_layer = []
+                for key in backward_layer:
+                    if time.time() - start_time > time_out:
+                        return self.generate_output(State(None, 0, 0, 0), "No solution", nodes_generated, start_time)
+                    depth = backward[key][2] + 1
+                    for move, player, stones in level.predecessors(*key):
+                        meeting = (player, stones)
+                        if meeting in backward:
+                            continue
+                        backward[meeting] = (key, move, depth)
+                        next_layer.append(meeting)
+                        nodes_generated += 1
+                        if meeting in forward:
+                            length = forward[meeting][1] + depth
+                            if best is None or length < best[0]:
+                                best = (length, meeting)
+                backward_layer = next_layer
+
+            if best is not None:
+                meeting = best[1]
+                path = self.rebuild_path(forward[meeting][0])
+                key, move, _ = backward[meeting]
+                while key is not None:
+                    path.append(move)
+                    key, move, _ = backward[key]
+                path = ''.join(path)
+                steps, weight = level.pathCost(path)
+                return self.generate_output(State(None, 0, steps, weight), path, nodes_generated, start_time)
+
+        return self.generate_output(State(None, 0, 0, 0), "No solution", nodes_generated, start_time)
+
+    def bfs_layered(self):
+        """
+        Layer-synchronous step-level BFS spread over `self.workers` processes. A layer is a compact array
+        of packed keys, sliced across the pool; every worker drops the children already in the shared
+        visited table, and the slices are merged by sorting on the key, which puts the duplicates found by
+        different workers next to each other. The merged layer is added to the table and becomes the next
+        frontier. Each layer also keeps every key's parent position in the previous layer and its move,
+        enough to walk the path back from a solved key.
+        """
+        start_time = time.time()
+        level = self.level
+        initial_key = level.initialState()
+        if self.is_goal(State(initial_key, 0, 0, 0)):
+            return self.generate_output(State(initial_key, 0, 0, 0), '', 1, start_time)
+
+        start = level.packState(initial_key.player, initial_key.stones)
+        table = SharedVisitedTable(TABLE_BITS)
+        table.add(start)
+        layers = [(array('Q', [start]), array('I', [0]), bytearray(1))]  # (keys, parent positions, moves) per depth
+        nodes_generated = 1
+        time_out = 60
+        pool = None
 
-    def is_valid_move(self, pos, stones):
-        x, y = pos
-        return 0 <= x < self.n and 0 <= y < self.m and self.grid[x][y] != '#' and pos not in stones
+        try:
+            while True:
+                if time.time() - start_time > time_out:
+                    return self.generate_output(State(None, 0, 0, 0), "No solution", nodes_generated, start_time)
 
-    def is_valid_push(self, pos, new_pos, stones):
-        x, y = new_pos
-        return 0 <= x < self.n and 0 <= y < self.m and self.grid[x][y] != '#' and new_pos not in stones
+                frontier = layers[-1][0]
+                if len(frontier) < PARALLEL_LAYER:
+                    results = [expand_keys(level, table, frontier, 0)]
+                else:
+                    if pool is None:
+                        pool = multiprocessing.Pool(self.workers, initializer=init_layer_worker, initargs=(level,))
+                    chunk = -(-len(frontier) // (self.workers * 4))
+                    tasks = [(table.memory.name, table.capacity_bits, frontier[first:first + chunk], first)
+                             for first in range(0, len(frontier), chunk)]
+                    results = pool.map(expand_layer_chunk, tasks)
+
+                # sort-and-merge: keep the first (parent, move) of every key, whichever worker found it
+                merged = sorted(entry for children, parents, moves, _ in results for entry in zip(children, parents, moves))
+                keys = array('Q')
+                parents = array('I')
+                moves = bytearray()
+                for key, parent, move in merged:
+                    if not keys or key != keys[-1]:
+                        keys.append(key)
+                        parents.append(parent)
+                        moves.append(move)
+                del merged
+                if not keys:
+                    return self.generate_output(State(None, 0, 0, 0), "No solution", nodes_generated, start_time)
+                layers.append((keys, parents, moves))
+                nodes_generated += len(keys)
+
+                solved = [key for result in results for key in result[3]]
+                if solved:
+                    path = self.rebuild_layers(layers, bisect_left(keys, min(solved)))
+                    steps, weight = level.pathCost(path)
+                    return self.generate_output(State(None, 0, steps, weight), path, nodes_generated, start_time)
+
+                while (table.count + len(keys)) * 2 > table.capacity:
+                    table = table.grown()
+                for key in keys:
+                    table.add(key)
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+            table.close(unlink=True)
+
+    def rebuild_layers(self, layers, position):
+        # Follow the parent positions from the last layer back to the root
+        moves = []
+        for depth in range(len(layers) - 1, 0, -1):
+            _, parents, layer_moves = layers[depth]
+            moves.append(chr(layer_moves[position]))
+            position = parents[position]
+        moves.reverse()
+        return ''.join(moves)
+
+    def bfs_external(self):
+        """
+        Step-level BFS with delayed duplicate detection, for levels whose visited set does not fit in RAM.
+        Every layer is a LayerFile of packed keys in a temporary folder. The children of a layer are
+        buffered RECORD_BUFFER at a time, each full buffer sorted and spilled as a run; the runs are merged
+        and every key already in an earlier layer is dropped on the way to the next layer's file, so the
+        search stops with "No solution" once a layer comes out empty. The step graph is directed (pushes
+        cannot be undone), so a state can come back any number of layers later: checking only the last
+        DUPLICATE_LAYERS layers reads fewer files but repeats states and never empties a layer on an
+        unsolvable level. No parents are stored: the path is rebuilt backwards from the solved key,
+        looking up its predecessors in each earlier layer.
+        """
+        start_time = time.time()
+        level = self.level
+        initial_key = level.initialState()
+        if self.is_goal(State(initial_key, 0, 0, 0)):
+            return self.generate_output(State(initial_key, 0, 0, 0), '', 1, start_time)
+
+        width = (level.keyBits + 7) // 8
+        work_dir = tempfile.mkdtemp(prefix='sokoban-bfs-')
+        layer = LayerFile(os.path.join(work_dir, 'layer-0'), width)
+        layer.append(level.packState(initial_key.player, initial_key.stones))
+        layer.finish()
+        layers = [layer]
+        nodes_generated = 1
+        time_out = 60
+
+        try:
+            while layers[-1].count:
+                depth = len(layers)
+                runs = []
+                buffer = []
+                for key in layers[-1]:
+                    if time.time() - start_time > time_out:
+                        return self.generate_output(State(None, 0, 0, 0), "No solution", nodes_generated, start_time)
+                    for move, child, stone_index in level.successors(level.unpackState(key)):
+                        child_key = level.packState(child.player, child.stones)
+                        if stone_index >= 0 and level.isSolved(child.stones):
+                            path = self.rebuild_external(layers, child_key)
+                            steps, weight = level.pathCost(path)
+                            return self.generate_output(State(None, 0, steps, weight), path, nodes_generated + 1, start_time)
+                        buffer.append(child_key)
+                    if len(buffer) >= RECORD_BUFFER:
+                        runs.append(self.spill_run(buffer, work_dir, depth, len(runs), width))
+                        buffer = []
+                if buffer:
+                    runs.append(self.spill_run(buffer, work_dir, depth, len(runs), width))
+                    buffer = []
+
+                layer = LayerFile(os.path.join(work_dir, f'layer-{depth}'), width)
+                seen = layers if DUPLICATE_LAYERS is None else layers[-DUPLICATE_LAYERS:]
+                for key in without_seen(merge_distinct(runs), seen):
+                    layer.append(key)
+                layer.finish()
+                for run in runs:
+                    run.close()
+                    os.remove(run.path)
+                layers.append(layer)
+                nodes_generated += layer.count
+
+            return self.generate_output(State(None, 0, 0, 0), "No solution", nodes_generated, start_time)
+        finally:
+            for layer in layers:
+                layer.close()
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def spill_run(self, buffer, work_dir, depth, number, width):
+        # Write a buffer of children as one sorted run without repeats
+        run = LayerFile(os.path.join(work_dir, f'run-{depth}-{number}'), width)
+        buffer.sort()
+        previous = None
+        for key in buffer:
+            if key != previous:
+                run.append(key)
+                previous = key
+        run.finish()
+        return run
+
+    def rebuild_external(self, layers, key):
+        # Backward pass: a predecessor of the key found by binary search in the layer before it
+        level = self.level
+        moves = []
+        for layer in reversed(layers):
+            state = level.unpackState(key)
+            for move, player, stones in level.predecessors(state.player, state.stones):
+                previous = level.packState(player, stones)
+                position = bisect_left(layer, previous)
+                if position < layer.count and layer[position] == previous:
+                    break
+            moves.append(move)
+            key = previous
+        moves.reverse()
+        return ''.join(moves)
+
+    def is_goal(self, state):
+        # Kiểm tra tất cả các vị trí stone hiện tại có nằm trên các switch không
+        return self.level.isSolved(state.key.stones)
 
-    def generate_output(self, final_state, nodes_generated, start_time):
+    def generate_output(self, final_state, path, nodes_generated, start_time):
         elapsed_time = time.time() - start_time
         memory_usage = psutil.Process().memory_info().rss / 1024 / 1024
         output_content = [
             "BFS",
             f"Steps: {final_state.steps}, Weight: {final_state.weight}, Nodes: {nodes_generated}, "
             f"Time (ms): {elapsed_time * 1000:.2f}, Memory (MB): {memory_usage:.2f}",
-            f"{final_state.path}\n"
+            f"{path}\n"
         ]
         with open(self.output_file, 'a') as f:
             f.write("\n".join(output_content))
 
-def remake_output(test_case):
-    input_file = f'Test_cases\\input-{test_case}.txt'
-    output_file = f'Outputs\\output-{test_case}.txt'
-    solver = MazeSolver(input_file, output_file)
+def remake_output(test_case, push_level=False, bidirectional=False, workers=0, external=False):
+    input_file = os.path.join('Test_cases', f'input-{test_case}.txt')
+    output_file = os.path.join('Outputs', f'output-{test_case}.txt')
+    solver = MazeSolver(input_file, output_file, push_level, bidirectional, workers, external)
     solver.bfs()
 
 def main():
      for i in range(1, 11):
-        input_file = f'Test_cases\\input-{i}.txt'
-        output_file = f'Outputs\\output-{i}.txt'
+        input_file = os.path.join('Test_cases', f'input-{i}.txt')
+        output_file = os.path.join('Outputs', f'output-{i}.txt')
         solver = MazeSolver(input_file, output_file)
         solver.bfs()
 
@@ -0,0 +1,168 @@
+import time
+import psutil
+from array import array
+from Modules.Engine import Level
+from Modules.Heuristic import MatchingHeuristic, INFINITY
+
+# class TranspositionTable: fixed-size memory of the cheapest cost each state was reached at
+#=======================================================================================================
+#=========================================== BEGIN CLASS: TRANSPOSITION TABLE ==========================
+class TranspositionTable:
+    def __init__(self, size_bits=20):
+        # one slot per (hash & mask), entries of older iterations count as empty
+        self.mask = (1 << size_bits) - 1
+        self.keys = array('Q', bytes(8 << size_bits))  # full 64-bit Zobrist hash of the stored state
+        self.states = [None] * (1 << size_bits)  # the stored state itself, compared on a hash match
+        self.costs = array('q', bytes(8 << size_bits))  # cheapest g the state was entered at
+        self.iterations = array('i', bytes(4 << size_bits))  # iteration that wrote the entry, 0 for none
+        self.hits = 0
+
+    def admit(self, state, g, iteration):
+        """the function to check if a state is worth entering at cost g, recording it if so"""
+
+        slot = state.hash & self.mask
+        if self.iterations[slot] == iteration and self.keys[slot] == state.hash and self.states[slot] == state:
+            if g >= self.costs[slot]:
+                # entered as cheaply before in this iteration, whose subtree already covers this one
+                self.hits += 1
+                return False
+            self.costs[slot] = g
+            return True
+
+        # replacement: take empty or stale slots, otherwise keep the entry nearer the root (smaller g)
+        if self.iterations[slot] != iteration or g <= self.costs[slot]:
+            self.keys[slot] = state.hash
+            self.states[slot] = state
+            self.costs[slot] = g
+            self.iterations[slot] = iteration
+        return True
+#=======================================================================================================
+#=========================================== END CLASS: TRANSPOSITION TABLE ============================
+
+# class IDA_Star_Search: define the iterative deepening A* search algorithm
+#=======================================================================================================
+#=========================================== BEGIN CLASS: IDA_Star_Search ==============================
+class IDA_Star_Search:
+    def __init__(self, level, table_bits=20):
+        self.level = level
+        self.weights = level.weights
+        self.matching = MatchingHeuristic(level)  # same admissible estimate as A*
+        self.table = TranspositionTable(table_bits)
+        self.iterations = 0
+        self.nodes_generated = 0
+        self.re_expansions = 0  # expansions already done by an earlier iteration with a lower bound
+        self.memory_used = 0
+
+    def search(self):
+        """the search function, returns the move string (None if not found) and the search time"""
+
+        process = psutil.Process()  # begin to monitor the memory usage
+        start_time = time.time()  # begin to monitor the time
+        max_time = 60
+
+        initial_state = self.level.initialState()
+        assignment = self.matching.solve(initial_state.stones)
+        threshold = assignment.total if assignment else INFINITY
+        previous_threshold = -1
+        solution = None
+        if self.level.isSolved(initial_state.stones):
+            solution = ''
+
+        # deepen the f bound to the smallest f that exceeded it until a solution fits under it
+        while solution is None and threshold != INFINITY:
+            if time.time() - start_time > max_time:
+                print("Time limit exceeded. No solution found.")
+                break
+            self.iterations += 1
+            solution, next_threshold = self.bounded_search(initial_state, assignment, threshold, previous_threshold, start_time + max_time)
+            previous_threshold, threshold = threshold, next_threshold
+
+        self.memory_used = process.memory_info().rss / (1024 * 1024)  # get the memory usage in MB
+        return solution, time.time() - start_time
+
+    def bounded_search(self, initial_state, initial_assignment, threshold, previous_threshold, deadline):
+        """the function to run one depth-first pass under the f bound, returns (solution, next bound)"""
+
+        level = self.level
+        weights = self.weights
+        table = self.table
+        iteration = self.iterations
+        next_threshold = INFINITY
+
+        table.admit(initial_state, 0, iteration)
+        moves = []
+        # one frame per state on the current path: (state, g, assignment, remaining successors)
+        stack = [(initial_state, 0, initial_assignment, level.successors(initial_state))]
+        while stack:
+            state, g, assignment, children = stack[-1]
+            for move, child, pushed_index in children:
+                if pushed_index < 0:
+                    # a walk moves no stone, so the parent's estimate still holds
+                    cost = g + 1
+                    child_assignment = assignment
+                else:
+                    cost = g + 1 + weights[pushed_index]
+                    child_assignment = self.matching.update(assignment, child.stones, pushed_index)
+                    if child_assignment is None:
+                        continue  # some stone can no longer reach any free switch
+                self.nodes_generated += 1
+                f = cost + child_assignment.total
+                if f > threshold:
+                    next_threshold = min(next_threshold, f)
+                    continue
+                if not table.admit(child, cost, iteration):
+                    continue
+                moves.append(move)
+                if pushed_index >= 0 and level.isSolved(child.stones):
+                    return ''.join(moves), threshold
+                if f <= previous_threshold:
+                    self.re_expansions += 1
+                stack.append((child, cost, child_assignment, level.successors(child)))
+                break
+            else:
+                # every successor of this state is done, step back to its parent
+                stack.pop()
+                if stack:
+                    moves.pop()
+                if time.time() > deadline:
+                    return None, INFINITY
+        return None, next_threshold
+#=======================================================================================================
+#=========================================== END CLASS: IDA_Star_Search ================================
+
+
+#=======================================================================================================
+#=========================================== GLOBAL FUNCTION  ==========================================
+def write_output_file(filename, steps, total_weight, nodes_generated, search_time, memory_used, iterations, re_expansions, actions):
+    """the function to write the output file"""
+
+    with open(filename, 'a') as file:
+        file.write("IDA*\n")
+        file.write(f"Steps: {steps}, Weight: {total_weight}, Nodes: {nodes_generated}, Time (ms): {search_time:.2f}, Memory (MB): {memory_used:.2f}, "
+                   f"Iterations: {iterations}, Re-expansions: {re_expansions}\n")
+        file.write(f"{actions}\n")
+
+def remake_output(test_case):
+    input_filename = f'Test_cases/input-{test_case}.txt'
+    output_filename = f'Outputs/output-{test_case}.txt'
+
+    level = Level.fromFile(input_filename)
+    search_algorithm = IDA_Star_Search(level)
+    actions, search_time = search_algorithm.search()
+
+    if actions is not None:
+        steps, total_weight = level.pathCost(actions)
+    else:
+        actions = "No solution"
+        steps = 0
+        total_weight = 0
+
+    write_output_file(output_filename, steps, total_weight, search_algorithm.nodes_generated, search_time * 1000,
+                      search_algorithm.memory_used, search_algorithm.iterations, search_algorithm.re_expansions, actions)
+
+def main():
+    for i in range(1, 11):
+        remake_output(i)
+
+if __name__ == "__main__":
+    main()
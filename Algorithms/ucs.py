@@ -1,149 +1,69 @@
-import heapq
-from typing import List, Tuple, Set, Dict
+from typing import List, Tuple, Dict
+import os
 import time
 import psutil
-from dataclasses import dataclass
+from array import array
+from Modules.Engine import Level, State
+from Modules.PriorityQueue import BucketQueue, TIE_FIFO
 
 # Maximum time (in seconds) allowed for solving a maze before timing out
 time_out = 60
 
-@dataclass(frozen=True)
-class Position:
-    x: int  
-    y: int 
-    
-    def __add__(self, other):
-        return Position(self.x + other.x, self.y + other.y)
-
-class State: 
-    """Represents a state of the maze with player position and stone weights"""
-    def __init__(self, player: Position, stone_weights: Dict[Position, int], cost: int = 0):
-        self.player = player
-        self.stone_weights = stone_weights  # Dictionary mapping stone positions to their weights
-        self.cost = cost  # Total cost to reach this state (moves + weight of pushed stones)
-        
-    def __lt__(self, other):
-        return self.cost < other.cost
-        
-    def __eq__(self, other):
-        return (self.player == other.player and self.stone_weights == other.stone_weights)
-        
-    def __hash__(self):
-        return hash((self.player, frozenset(self.stone_weights.items())))
-
 class MazeSolver:
-    def __init__(self, maze: List[str], stone_weights: List[int]):
-        # Clean up the maze input and ensure all rows have same width
-        self.maze = [row.rstrip() for row in maze] 
-        self.width = max(len(row) for row in self.maze)
-        self.maze = [row.ljust(self.width) for row in self.maze]
-        self.height = len(self.maze)
-        
-        self.switches = set()  # switches positions
-        self.walls = set()  # wall positions
+    def __init__(self, maze: List[str], stone_weights: List[int], push_level: bool = False, tie_break: str = TIE_FIFO):
+        # Walls, switches and the flattened cell index are encoded once in the shared level;
+        # a state is the engine State, whose hash is updated incrementally on every move
+        self.level = Level(maze, stone_weights)
+        self.push_level = push_level  # search over pushes instead of single steps
+        self.tie_break = tie_break  # order of equal-cost states in the bucket queue (fifo, lifo, g or h)
         self.nodes_generated = 0  
-        self.start_pos = None  # start position of Ares
-        
-        # Initialize stone positions and weights
-        stone_positions = {}
-        stone_idx = 0
-        
-        # First pass: find switches and walls
-        for i in range(self.height):
-            for j in range(self.width):
-                pos = Position(i, j)
-                cell = self.maze[i][j]
-                
-                if cell == '#':
-                    self.walls.add(pos)
-                elif cell in ['.', '*', '+']:  # All switch positions
-                    self.switches.add(pos)
-                    
-        # Second pass: find stones and player
-        for i in range(self.height):
-            for j in range(self.width):
-                pos = Position(i, j)
-                cell = self.maze[i][j]
-                
-                if cell in ['$', '*']:  # Stone or stone on switch
-                    if stone_idx < len(stone_weights):
-                        stone_positions[pos] = stone_weights[stone_idx]
-                        stone_idx += 1
-                elif cell in ['@', '+']:  # Player or player on switch
-                    self.start_pos = pos
-                    
-        # Validate maze setup
-        if self.start_pos is None:
-            raise ValueError("No starting position '@' found in maze")
-            
-        if stone_idx != len(stone_weights):
-            raise ValueError(f"Mismatch between number of stones in maze ({stone_idx}) and weights provided ({len(stone_weights)})")
-            
-        self.initial_stone_weights = stone_positions
+        self.duplicates = 0  # generated states already queued at an equal or lower cost, never pushed
+        self.stale_pops = 0  # queue entries popped after their state was reached more cheaply
+        self.parents = array('i', [-1])  # parent node of every generated node, the root has none
+        self.moves = ['']  # move (or push) leading to every generated node
 
-        if len(self.switches) != len(stone_positions):
-            raise ValueError(f"Mismatch between number of switches ({len(self.switches)}) and stones ({len(stone_positions)})")
-
-    def is_valid_pos(self, pos: Position) -> bool:
-        """Check if a position is within maze bounds and not a wall"""
-        return (0 <= pos.x < self.height and 0 <= pos.y < self.width and pos not in self.walls)
+        if len(self.level.goals) != len(self.level.startStones):
+            raise ValueError(f"Mismatch between number of switches ({len(self.level.goals)}) and stones ({len(self.level.startStones)})")
 
     def get_initial_state(self) -> State:
         """Create the initial state of the maze"""
-        return State(self.start_pos, self.initial_stone_weights)
+        return self.level.initialState()
 
     def is_goal_state(self, state: State) -> bool:
         """
         Check if current state is a goal state
         Goal: All stones are on switches (and number of stones equals number of switches)
         """
-        stone_positions = set(state.stone_weights.keys())
-        return stone_positions.issubset(self.switches) and len(stone_positions) == len(self.switches)
+        return self.level.isSolved(state.stones)
 
-    def get_neighbors(self, state: State) -> List[Tuple[State, str]]:
+    def get_neighbors(self, state: State) -> List[Tuple[State, str, int]]:
         """
         Generate all possible next states from current state
-        Returns list of (new_state, move) pairs where move is the action taken:
-        - lowercase (u,d,l,r) for simple moves
-        - uppercase (U,D,L,R) for pushing stones
+        Returns list of (new_state, move, move_cost) where move is the action taken:
+        - lowercase (u,d,l,r) for simple moves, costing 1
+        - uppercase (U,D,L,R) for pushing stones, costing 1 plus the weight of the pushed stone
         """
         neighbors = []
-        moves = [
-            (Position(-1, 0), 'u', 'U'),  # up
-            (Position(1, 0), 'd', 'D'),   # down
-            (Position(0, -1), 'l', 'L'),  # left
-            (Position(0, 1), 'r', 'R')    # right
-        ]
-
-        for delta, move_char, push_char in moves:
-            new_pos = state.player + delta 
-            
-            if not self.is_valid_pos(new_pos):
-                continue
-                
-            stones = set(state.stone_weights.keys())
-            
-            # Case 1: Moving to empty space
-            if new_pos not in stones:
-                neighbors.append((State(new_pos, state.stone_weights, state.cost + 1), move_char))
-            # Case 2: Pushing a stone
-            else:
-                push_pos = new_pos + delta  # Position where stone will end up
-                if (self.is_valid_pos(push_pos) and push_pos not in stones):
-                    # Create new stone positions dictionary with pushed stone
-                    new_stone_weights = dict(state.stone_weights)
-                    stone_weight = new_stone_weights.pop(new_pos)
-                    new_stone_weights[push_pos] = stone_weight
-                    
-                    # Cost increases by 1 (for move) plus weight of pushed stone
-                    push_cost = state.cost + 1 + stone_weight
-                    neighbors.append((
-                        State(new_pos, new_stone_weights, push_cost),
-                        push_char
-                    ))
-
+        for move, next_state, stone_index in self.level.successors(state):
+            move_cost = 1 if stone_index < 0 else 1 + self.level.weights[stone_index]
+            neighbors.append((next_state, move, move_cost))
         return neighbors
 
+    def add_node(self, parent: int, move) -> int:
+        """Record a generated node as its parent and move, returns the node index"""
+        self.parents.append(parent)
+        self.moves.append(move)
+        return len(self.moves) - 1
+
+    def rebuild_path(self, node: int) -> list:
+        """Moves (or pushes) from the root to a node, following the parent links"""
+        moves = []
+        while node > 0:
+            moves.append(self.moves[node])
+            node = self.parents[node]
+        moves.reverse()
+        return moves
+
     def solve_ucs(self) -> Tuple[List[str], Dict]:
         """
         Solve maze using Uniform Cost Search (UCS) algorithm
@@ -151,70 +71,139 @@ class MazeSolver:
         - Solution path as list of moves
         - Statistics dictionary with steps, weight, nodes explored, time, and memory usage
         """
+        if self.push_level:
+            return self.solve_ucs_pushes()
+
         # Initialize process for memory monitoring
         process = psutil.Process()
         start_time = time.time()
         
         initial_state = self.get_initial_state()
-        pq = [(0, [], initial_state)]  # Priority queue: (cost, path, state)
-        visited = set()  # Keep track of visited states to avoid cycles
+        pq = BucketQueue(self.tie_break)  # Priority queue: cost -> (node, state), costs are small integers
+        pq.push(0, (0, initial_state))
+        best_cost = {initial_state: 0}  # Cheapest known cost of every queued or expanded state
         
         while pq:
-            cost, path, current_state = heapq.heappop(pq)
+            cost, (node, current_state) = pq.pop()
 
             # Check for timeout
             if time.time() - start_time > time_out:
                 print("Timeout reached. Exiting UCS.")
+                path = self.rebuild_path(node)
                 memory_used = process.memory_info().rss / (1024 ** 2)  # Convert to MB
                 stats = {
                     'steps': len(path),
                     'weight': cost - len(path),  # Total weight = cost - number of moves
                     'nodes': self.nodes_generated,
+                    'duplicates': self.duplicates,
+                    'stale_pops': self.stale_pops,
                     'time': (time.time() - start_time) * 1000,  # Convert to milliseconds
                     'memory': memory_used
                 }
                 return None, stats  
             
-            # Skip if state already visited
-            if current_state in visited:
+            # Skip entries superseded by a cheaper push of the same state (lazy deletion)
+            if cost > best_cost[current_state]:
+                self.stale_pops += 1
                 continue
-                
-            visited.add(current_state)
             
             # Check if goal reached
             if self.is_goal_state(current_state):
+                path = self.rebuild_path(node)
                 memory_used = process.memory_info().rss / (1024 ** 2)
                 total_push_weight = cost - len(path)
                 stats = {
                     'steps': len(path),
                     'weight': total_push_weight,
                     'nodes': self.nodes_generated,
+                    'duplicates': self.duplicates,
+                    'stale_pops': self.stale_pops,
                     'time': (time.time() - start_time) * 1000,
                     'memory': memory_used
                 }
                 return path, stats
             
             # Explore neighbors
-            for next_state, move in self.get_neighbors(current_state):
-                if next_state not in visited:
-                    self.nodes_generated += 1
-                    heapq.heappush(pq, (
-                        next_state.cost,
-                        path + [move],
-                        next_state
-                    ))
+            for next_state, move, move_cost in self.get_neighbors(current_state):
+                next_cost = cost + move_cost
+                if next_cost >= best_cost.get(next_state, next_cost + 1):
+                    self.duplicates += 1
+                    continue
+                best_cost[next_state] = next_cost
+                self.nodes_generated += 1
+                pq.push(next_cost, (self.add_node(node, move), next_state), next_cost)
         
         # No solution found
+        path = self.rebuild_path(node)
         memory_used = process.memory_info().rss / (1024 ** 2)
         stats = {
             'steps': len(path),
             'weight': cost - len(path),
             'nodes': self.nodes_generated,
+            'duplicates': self.duplicates,
+            'stale_pops': self.stale_pops,
             'time': (time.time() - start_time) * 1000,
             'memory': memory_used
         }
         return None, stats
 
+    def solve_ucs_pushes(self) -> Tuple[List[str], Dict]:
+        """
+        Push-level UCS: a node is the stone layout plus the canonical cell of the player's region
+        and an edge is one push, costing the walk to the stone, the push step and the stone weight.
+        The walk is measured from where the first path to reach the region left the player, so the
+        result is not guaranteed optimal, in exchange for far fewer nodes.
+        Returns the same (solution, stats) pair as solve_ucs
+        """
+        process = psutil.Process()
+        start_time = time.time()
+        level = self.level
+
+        initial_state = level.normalize(self.get_initial_state())
+        pq = BucketQueue(self.tie_break)  # Priority queue: cost -> (node, state, cell the player stands on)
+        pq.push(0, (0, initial_state, level.startPlayer))
+        best_cost = {initial_state: 0}
+
+        while pq:
+            cost, (node, current_state, player) = pq.pop()
+
+            if time.time() - start_time > time_out:
+                print("Timeout reached. Exiting UCS.")
+                return None, self.get_stats('', process, start_time)
+
+            if cost > best_cost[current_state]:
+                self.stale_pops += 1
+                continue
+
+            if self.is_goal_state(current_state):
+                path = level.expandPushes(self.rebuild_path(node))
+                return list(path), self.get_stats(path, process, start_time)
+
+            for push, walk_steps, pushes, next_state in level.pushSuccessors(current_state, player):
+                next_cost = cost + walk_steps + pushes * (1 + level.weights[push[0]])
+                if next_cost >= best_cost.get(next_state, next_cost + 1):
+                    self.duplicates += 1
+                    continue
+                best_cost[next_state] = next_cost
+                self.nodes_generated += 1
+                pushed_player = level.pushedPlayer(push, next_state.stones, current_state.stones)
+                pq.push(next_cost, (self.add_node(node, push), next_state, pushed_player), next_cost)
+
+        return None, self.get_stats('', process, start_time)
+
+    def get_stats(self, path: str, process, start_time: float) -> Dict:
+        """Statistics dictionary of a finished search, weights are replayed from the path"""
+        steps, weight = self.level.pathCost(path)
+        return {
+            'steps': steps,
+            'weight': weight,
+            'nodes': self.nodes_generated,
+            'duplicates': self.duplicates,
+            'stale_pops': self.stale_pops,
+            'time': (time.time() - start_time) * 1000,
+            'memory': process.memory_info().rss / (1024 ** 2)
+        }
+
 def read_input(filepath: str) -> Tuple[List[int], List[str]]:
     """Read stone weights and maze layout from input file"""
     with open(filepath, 'r') as f:
@@ -228,26 +217,27 @@ def write_output(filepath: str, solution: List[str], stats: Dict):
         f.write('UCS\n')
         f.write(f"Steps: {stats['steps']}, Weight: {stats['weight']}, " +
                 f"Nodes: {stats['nodes']}, Time (ms): {stats['time']:.2f}, " +
-                f"Memory (MB): {stats['memory']:.2f}\n")
+                f"Memory (MB): {stats['memory']:.2f}, " +
+                f"Duplicates: {stats['duplicates']}, Stale pops: {stats['stale_pops']}\n")
         f.write(f"{''.join(solution) if solution else 'No solution'}\n")
 
-def solve_maze(input_path: str, output_path: str):
+def solve_maze(input_path: str, output_path: str, push_level: bool = False):
     """Main function to solve a single maze puzzle"""
     stone_weights, maze = read_input(input_path)
-    solver = MazeSolver(maze, stone_weights)
+    solver = MazeSolver(maze, stone_weights, push_level)
     solution, stats = solver.solve_ucs()
     write_output(output_path, solution, stats)
 
-def remake_output(test_case):
-    input_file = f'Test_cases\\input-{test_case}.txt'
-    output_file = f'Outputs\\output-{test_case}.txt'
-    solve_maze(input_file, output_file)
+def remake_output(test_case, push_level=False):
+    input_file = os.path.join('Test_cases', f'input-{test_case}.txt')
+    output_file = os.path.join('Outputs', f'output-{test_case}.txt')
+    solve_maze(input_file, output_file, push_level)
 
 def main():
     """Process all test cases from input-1.txt to input-10.txt"""
     for i in range(1, 11):
-        input_file = f'Test_cases\\input-{i}.txt'
-        output_file = f'Outputs\\output-{i}.txt'
+        input_file = os.path.join('Test_cases', f'input-{i}.txt')
+        output_file = os.path.join('Outputs', f'output-{i}.txt')
         solve_maze(input_file, output_file)
 
 if __name__ == "__main__":
@@ -3,7 +3,8 @@ from tkinter import ttk, messagebox
 from ttkthemes import ThemedTk
 import os
 from PIL import Image, ImageTk
-from Algorithms import ucs, bfs, dfs, a_star
+from Modules.SolutionCache import SolutionCache
+import batch
 import copy
 
 class SokobanGUI:
@@ -93,12 +94,12 @@ class SokobanGUI:
         begin_label = ttk.Label(self.root, text="Remaking missing mazes...")
         begin_label.grid(row=6, column=0)
 
+        cache = SolutionCache()
         while self.missing_maze:
             maze = self.missing_maze.pop()
-            bfs.remake_output(maze)
-            dfs.remake_output(maze)
-            ucs.remake_output(maze)
-            a_star.remake_output(maze)
+            for algorithm in batch.ALGORITHMS: # BFS, DFS, UCS, A*, IDA*
+                batch.remake_cached(algorithm, maze, cache)
+        cache.close()
 
         begin_label.destroy()
 
@@ -116,7 +117,7 @@ class SokobanGUI:
         ttk.Label(control_frame, text="Algorithm:").grid(row=0, column=0, padx=5)
         self.algo_var = tk.StringVar(value="UCS")
         algo_combo = ttk.Combobox(control_frame, textvariable=self.algo_var, 
-                                  values=["BFS", "DFS", "UCS", "A*"], state="readonly")
+                                  values=["BFS", "DFS", "UCS", "A*", "IDA*"], state="readonly")
         algo_combo.grid(row=0, column=1, padx=5)
 
 
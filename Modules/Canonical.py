@@ -0,0 +1,110 @@
+from Modules import MatrixHelper
+from Modules import MazeHelper
+from Modules.Engine import Level
+from Modules.SolutionCache import levelFingerprint
+
+# What each move becomes after one clockwise quarter turn (MatrixHelper.rotateMatrix) and after a left-right mirror (MatrixHelper.flip_horizontal)
+ROTATED = str.maketrans('urdlURDL', 'rdluRDLU')
+MIRRORED = str.maketrans('lrLR', 'rlRL')
+MOVE_LETTERS = 'udlrUDLR'
+
+def reachableCells(mazeMatrix : list) -> set:
+    """(row, col) of every non-wall cell connected to the player, stones counted as floor since they can move"""
+    start = MazeHelper.getPlayerPosition(mazeMatrix)
+    if start is None:
+        raise ValueError("No starting position '@' found in maze")
+    seen = {start}
+    frontier = [start]
+    for row, col in frontier:
+        for neighbor in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+            nextRow, nextCol = neighbor
+            if neighbor in seen or not 0 <= nextRow < len(mazeMatrix) or not 0 <= nextCol < len(mazeMatrix[nextRow]):
+                continue
+            if MazeHelper.isWall(mazeMatrix[nextRow][nextCol]):
+                continue
+            seen.add(neighbor)
+            frontier.append(neighbor)
+    return seen
+
+class CanonicalLevel:
+    """
+    A level cut down to the area its player can reach and turned into the smallest of its 8 rotations and
+    mirror images (compared as text, then by weights), so that symmetric copies share one form and one `key`.
+    Empty cells the player can never reach become walls; stones and goals out there are kept, since a stone
+    walled in off a goal makes the level unsolvable and must not share a key with the level without it.
+    The transform is kept to move solutions between the original level and the canonical one.
+    """
+    def __init__(self, mazeMatrix : list, rockWeights : list) -> None:
+        weights = [int(weight) for weight in rockWeights if str(weight).strip()]
+        kept = reachableCells(mazeMatrix)
+        kept.update((row, col) for row in range(len(mazeMatrix)) for col, symbol in enumerate(mazeMatrix[row])
+                    if MazeHelper.isRock(symbol) or MazeHelper.isSwitch(symbol))
+        top = min(row for row, _ in kept)
+        bottom = max(row for row, _ in kept)
+        left = min(col for _, col in kept)
+        right = max(col for _, col in kept)
+
+        # the trimmed maze and, alongside it, the weight index of every stone (stones are numbered in reading order)
+        maze = []
+        stones = []
+        stoneIndex = 0
+        for row in range(len(mazeMatrix)):
+            for col, symbol in enumerate(mazeMatrix[row]):
+                if MazeHelper.isRock(symbol):
+                    stones.append(((row, col), stoneIndex))
+                    stoneIndex += 1
+        if stoneIndex != len(weights):
+            raise ValueError(f"Mismatch between number of stones in maze ({stoneIndex}) and weights provided ({len(weights)})")
+        stoneAt = dict(stones)
+        labels = []
+        for row in range(top, bottom + 1):
+            maze.append([mazeMatrix[row][col] if (row, col) in kept else '#' for col in range(left, right + 1)])
+            labels.append([stoneAt.get((row, col)) for col in range(left, right + 1)])
+
+        best = None
+        for mirrored in (False, True):
+            candidate = MatrixHelper.flip_horizontal(maze) if mirrored else maze
+            candidateLabels = MatrixHelper.flip_horizontal(labels) if mirrored else labels
+            for rotations in range(4):
+                text = '\n'.join(''.join(row) for row in candidate)
+                order = tuple(weights[index] for row in candidateLabels for index in row if index is not None)
+                if best is None or (text, order) < best[:2]:
+                    best = (text, order, mirrored, rotations)
+                candidate = MatrixHelper.rotateMatrix(candidate)
+                candidateLabels = MatrixHelper.rotateMatrix(candidateLabels)
+
+        text, order, self.mirrored, self.rotations = best
+        self.mazeMatrix = text.split('\n')
+        self.weights = order
+        moves = MOVE_LETTERS.translate(MIRRORED) if self.mirrored else MOVE_LETTERS
+        for _ in range(self.rotations):
+            moves = moves.translate(ROTATED)
+        self.toTable = str.maketrans(MOVE_LETTERS, moves)
+        self.fromTable = str.maketrans(moves, MOVE_LETTERS)
+        self.key = levelFingerprint(self.toText())
+
+    @classmethod
+    def fromText(cls, levelText : str) -> 'CanonicalLevel':
+        lines = levelText.split('\n')
+        mazeMatrix = [line.rstrip('\r') for line in lines[1:]]
+        return cls(mazeMatrix, lines[0].split())
+
+    @classmethod
+    def fromFile(cls, filepath : str) -> 'CanonicalLevel':
+        with open(filepath, 'r') as f:
+            return cls.fromText(f.read())
+
+    def toText(self) -> str:
+        """The canonical level in the input file format"""
+        return ' '.join(str(weight) for weight in self.weights) + '\n' + '\n'.join(self.mazeMatrix) + '\n'
+
+    def makeLevel(self) -> Level:
+        return Level(self.mazeMatrix, self.weights)
+
+    def toCanonical(self, moves : str) -> str:
+        """Moves solving the original level turned into the moves solving the canonical one"""
+        return moves.translate(self.toTable)
+
+    def fromCanonical(self, moves : str) -> str:
+        """Moves solving the canonical level turned back into moves solving the original one"""
+        return moves.translate(self.fromTable)
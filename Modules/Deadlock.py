@@ -0,0 +1,45 @@
+import Modules.MazeHelper as MazeHelper
+
+def isBlocked(level, stones, cell : int, offset : int, assumed : set, frozen : list) -> bool:
+    # can the rock on `cell` never move along the axis of `offset` again
+    before, after = cell - offset, cell + offset
+    floor = level.floor
+    if not floor[before] or not floor[after] or before in assumed or after in assumed:
+        return True
+    if level.dead[before] and level.dead[after]:
+        return True
+    for neighbor in (before, after):
+        if neighbor in stones and isFrozen(level, stones, neighbor, assumed, frozen):
+            return True
+    return False
+
+def isFrozen(level, stones, cell : int, assumed : set, frozen : list) -> bool:
+    # a rock is frozen when blocked on both axes; rocks on the current chain count as walls
+    assumed.add(cell)
+    result = isBlocked(level, stones, cell, level.width, assumed, frozen) and isBlocked(level, stones, cell, 1, assumed, frozen)
+    assumed.discard(cell)
+    if result:
+        frozen.append(cell)
+    return result
+
+def isFreezeDeadlock(level, stones, rockCell : int) -> bool:
+    """The pushed rock and the rocks blocking it can never move again while one of them is off a switch"""
+    frozen = []
+    if not isFrozen(level, stones, rockCell, set(), frozen):
+        return False
+    isGoal = level.isGoal
+    for cell in frozen:
+        if not isGoal[cell]:
+            return True
+    return False
+
+def isDeadlock(level, stones, rockCell : int) -> bool:
+    """
+    Common deadlock test run by every solver right after a rock is pushed onto `rockCell`
+    (`stones` already holds the rock there): dead square, 3x3 scenario table, then freeze.
+    """
+    if level.dead[rockCell]:
+        return True
+    if not level.isGoal[rockCell] and MazeHelper.isOnDeadlockScenario(level, stones, rockCell):
+        return True
+    return isFreezeDeadlock(level, stones, rockCell)
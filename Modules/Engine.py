@@ -0,0 +1,654 @@
+import random
+from functools import cached_property
+import Modules.MazeHelper as MazeHelper
+import Modules.Deadlock as Deadlock
+
+MOVES = 'udlr'
+PUSHES = 'UDLR'
+ZOBRIST_SEED = 2034 # fixed so that every process hashes the same state to the same value
+
+class State:
+    """
+    Dynamic part of a search node: the player cell, the stone cells ordered by stone index,
+    and the Zobrist hash of both, updated in O(1) per walk or push instead of rehashing.
+    Sets and dicts only fall back to __eq__ when two hashes collide.
+    """
+    __slots__ = ('player', 'stones', 'hash')
+
+    def __init__(self, player : int, stones : tuple, hash : int) -> None:
+        self.player = player
+        self.stones = stones
+        self.hash = hash
+
+    def __hash__(self) -> int:
+        return self.hash
+
+    def __eq__(self, other) -> bool:
+        return self.player == other.player and self.stones == other.stones
+
+class GoalRoom:
+    """
+    Goals the rest of the level reaches only through one `entrance` cell. `cells` is the room past the entrance,
+    `order` its goals in a fill order found by retrograde analysis, and `routes[direction][k]` how a stone on
+    the entrance pushed in `direction` reaches `order[k]` once the first k slots are filled, as
+    (moves, walkSteps, pushes, final player cell), or None when it cannot from that side.
+    The routes only hold while the stones in the room are exactly the first k slots (see filledSlots).
+    """
+    __slots__ = ('entrance', 'cells', 'order', 'routes')
+
+    def __init__(self, entrance : int, cells : frozenset, order : tuple, routes : dict) -> None:
+        self.entrance = entrance
+        self.cells = cells
+        self.order = order
+        self.routes = routes
+
+class Level:
+    """
+    Static part of a level, encoded once and shared by every solver.
+    Cells are flattened to a single integer index on a grid padded with one ring of wall, so a neighbor is always `cell + offset` and never out of bounds.
+    A dynamic state is a State holding the player cell and a tuple of stone cells ordered
+    by stone index (the order of `weights`).
+    """
+    def __init__(self, mazeMatrix : list, rockWeights : list) -> None:
+        self.weights = tuple(int(weight) for weight in rockWeights if str(weight).strip())
+        self.rows = len(mazeMatrix)
+        self.cols = max((len(row) for row in mazeMatrix), default=0)
+        self.height = self.rows + 2
+        self.width = self.cols + 2
+        self.size = self.width * self.height
+        self.offsets = (-self.width, self.width, -1, 1) # same order as MOVES
+        self.cellBits = (self.size - 1).bit_length() # bits of one cell in a packed key
+
+        self.floor = bytearray(self.size) # 1 for every non-wall cell
+        self.isGoal = bytearray(self.size)
+        goals = []
+        stones = []
+        player = None
+        for row in range(self.rows):
+            for col, symbol in enumerate(mazeMatrix[row]):
+                cell = self.toCell(row, col)
+                if MazeHelper.isWall(symbol):
+                    continue
+                self.floor[cell] = 1
+                if MazeHelper.isSwitch(symbol):
+                    self.isGoal[cell] = 1
+                    goals.append(cell)
+                if MazeHelper.isRock(symbol):
+                    stones.append(cell)
+                if MazeHelper.isPlayer(symbol):
+                    player = cell
+
+        if player is None:
+            raise ValueError("No starting position '@' found in maze")
+        if len(stones) != len(self.weights):
+            raise ValueError(f"Mismatch between number of stones in maze ({len(stones)}) and weights provided ({len(self.weights)})")
+
+        # preprocessing: floor the player can never reach is walled off, except under stones, which then never move
+        reachable = self.findReachable(player)
+        for cell in range(self.size):
+            if self.floor[cell] and not reachable[cell] and cell not in stones:
+                self.floor[cell] = 0
+                self.isGoal[cell] = 0
+        goals = [goal for goal in goals if self.isGoal[goal]]
+
+        self.goals = tuple(goals)
+        self.keyBits = self.cellBits * (len(self.weights) + 1) # bits of a packed key, see packState
+        self.startPlayer = player
+        self.startStones = tuple(stones)
+        self.dead = self.findDeadSquares()
+        # cells a stone may be pushed onto: floor that is not a dead square
+        self.stoneFloor = bytearray(isFloor and not isDead for isFloor, isDead in zip(self.floor, self.dead))
+        self.tunnels = self.findTunnels()
+
+        # one random key per (player, cell) and per (stone index, cell)
+        generator = random.Random(ZOBRIST_SEED)
+        self.zobristPlayer = [generator.getrandbits(64) for _ in range(self.size)]
+        self.zobristStones = [[generator.getrandbits(64) for _ in range(self.size)] for _ in self.weights]
+
+    @classmethod
+    def fromFile(cls, filepath : str) -> 'Level':
+        with open(filepath, 'r') as f:
+            rockWeights = f.readline().split()
+            mazeMatrix = [line.rstrip('\r\n') for line in f]
+        while mazeMatrix and not mazeMatrix[-1].strip():
+            mazeMatrix.pop()
+        return cls(mazeMatrix, rockWeights)
+
+    def toCell(self, row : int, col : int) -> int:
+        return (row + 1) * self.width + col + 1
+
+    def toPosition(self, cell : int) -> tuple:
+        row, col = divmod(cell, self.width)
+        return (row - 1, col - 1)
+
+    def makeState(self, player : int, stones : tuple) -> State:
+        """Build a state hashing it from scratch, only needed for states not reached by a move"""
+        hash = self.zobristPlayer[player]
+        for index, stone in enumerate(stones):
+            hash ^= self.zobristStones[index][stone]
+        return State(player, stones, hash)
+
+    def packState(self, player : int, stones : tuple) -> int:
+        """
+        Fixed-width integer key of a position, `cellBits` bits per cell: the player in the lowest bits,
+        then the stones from the smallest cell up. Stone identity is dropped, so equal layouts share a key.
+        """
+        cellBits = self.cellBits
+        key = 0
+        for stone in sorted(stones, reverse=True):
+            key = (key << cellBits) | stone
+        return (key << cellBits) | player
+
+    def unpackState(self, key : int) -> State:
+        """State of a packed key, its stones ordered by cell rather than by stone index"""
+        cellBits = self.cellBits
+        mask = (1 << cellBits) - 1
+        player = key & mask
+        stones = []
+        for _ in self.weights:
+            key >>= cellBits
+            stones.append(key & mask)
+        return self.makeState(player, tuple(stones))
+
+    def initialState(self) -> State:
+        return self.makeState(self.startPlayer, self.startStones)
+
+    def isSolved(self, stones : tuple) -> bool:
+        isGoal = self.isGoal
+        for stone in stones:
+            if not isGoal[stone]:
+                return False
+        return True
+
+    def findReachable(self, player : int) -> bytearray:
+        """Mark every floor cell the player can ever get to, stones counted as floor since they can be moved"""
+        floor = self.floor
+        reachable = bytearray(self.size)
+        reachable[player] = 1
+        frontier = [player]
+        for cell in frontier:
+            for offset in self.offsets:
+                neighbor = cell + offset
+                if floor[neighbor] and not reachable[neighbor]:
+                    reachable[neighbor] = 1
+                    frontier.append(neighbor)
+        return reachable
+
+    def findTunnels(self) -> bytearray:
+        """
+        Mark the one-wide corridors: bit 1 on floor cells walled on the left and right (a tunnel for up/down
+        pushes), bit 2 on floor cells walled above and below (a tunnel for left/right pushes).
+        The bit of a direction index is `1 << (direction >> 1)`.
+        """
+        floor = self.floor
+        width = self.width
+        tunnels = bytearray(self.size)
+        for cell in range(width, self.size - width):
+            if floor[cell]:
+                tunnels[cell] = (not floor[cell - 1] and not floor[cell + 1]) | (not floor[cell - width] and not floor[cell + width]) << 1
+        return tunnels
+
+    def tunnelPushes(self, stones : tuple, index : int, direction : int) -> tuple:
+        """
+        Stretch a push of stone `index` into a macro push through a tunnel, given the `stones` right after it.
+        While the stone and the player behind it both stand in a tunnel along the push, the stone is off the
+        goals and the next push is legal and does not deadlock, the stone is pushed on: left there it could only
+        block the tunnel until pushed on anyway. Returns (number of pushes, stones after the last one).
+        """
+        tunnels = self.tunnels
+        stoneFloor = self.stoneFloor
+        isGoal = self.isGoal
+        offset = self.offsets[direction]
+        axis = 1 << (direction >> 1)
+        stone = stones[index]
+        count = 1
+        while tunnels[stone] & axis and tunnels[stone - offset] & axis and not isGoal[stone] and stone not in self.roomAt:
+            target = stone + offset
+            if not stoneFloor[target] or target in stones:
+                break
+            newStones = stones[:index] + (target,) + stones[index + 1:]
+            if Deadlock.isDeadlock(self, newStones, target):
+                break
+            stones = newStones
+            stone = target
+            count += 1
+        return count, stones
+
+    @cached_property
+    def rooms(self) -> list:
+        """Goal rooms of the level, found on first use since only push-level searches need them"""
+        return self.findGoalRooms()
+
+    @cached_property
+    def roomAt(self) -> dict:
+        return {room.entrance: room for room in self.rooms}
+
+    def findGoalRooms(self) -> list:
+        """
+        Find the empty rooms of goals behind a single entrance cell, with a fill order for each, when every
+        goal has to be filled. Rooms inside a bigger room are left to the bigger one.
+        One depth-first pass from the player finds the articulation points: the subtree under a child whose
+        lowpoint does not climb above the entrance is the part of the level cut off behind it, and it holds
+        the preorder numbers [order[child], end[child]), so counting its goals and stones is O(1).
+        """
+        if len(self.goals) != len(self.weights):
+            return []
+        floor = self.floor
+        offsets = self.offsets
+        root = self.startPlayer
+        order = [-1] * self.size
+        low = [0] * self.size
+        end = [0] * self.size
+        preorder = [root]
+        order[root] = 0
+        cuts = [] # (entrance, child) with the child's subtree cut off behind the entrance
+        stack = [(root, 0)]
+        while stack:
+            cell, direction = stack[-1]
+            if direction < 4:
+                stack[-1] = (cell, direction + 1)
+                neighbor = cell + offsets[direction]
+                if not floor[neighbor]:
+                    continue
+                if order[neighbor] < 0:
+                    order[neighbor] = low[neighbor] = len(preorder)
+                    preorder.append(neighbor)
+                    stack.append((neighbor, 0))
+                elif order[neighbor] < low[cell]:
+                    low[cell] = order[neighbor]
+                continue
+            stack.pop()
+            end[cell] = len(preorder)
+            if stack:
+                parent = stack[-1][0]
+                if low[cell] < low[parent]:
+                    low[parent] = low[cell]
+                if low[cell] >= order[parent] and parent != root:
+                    cuts.append((parent, cell))
+
+        # running counts of goals and stones over the preorder
+        goalsBefore = [0]
+        stonesBefore = [0]
+        stones = set(self.startStones)
+        for cell in preorder:
+            goalsBefore.append(goalsBefore[-1] + self.isGoal[cell])
+            stonesBefore.append(stonesBefore[-1] + (cell in stones))
+
+        # outer subtrees first, so the ones inside a room already made are skipped
+        rooms = []
+        roomEnd = 0
+        for entrance, child in sorted(cuts, key=lambda cut: order[cut[1]]):
+            first, last = order[child], end[child]
+            if first < roomEnd or self.isGoal[entrance] or entrance in stones:
+                continue
+            if stonesBefore[last] != stonesBefore[first] or goalsBefore[last] == goalsBefore[first]:
+                continue
+            room = self.makeGoalRoom(entrance, frozenset(preorder[first:last]))
+            if room is not None:
+                rooms.append(room)
+                roomEnd = last
+
+        return sorted(rooms, key=lambda room: (room.entrance, min(direction for direction, offset in enumerate(offsets)
+                                                                  if room.entrance + offset in room.cells)))
+
+    def makeGoalRoom(self, entrance : int, cells : frozenset):
+        """
+        Fill order of a room by retrograde analysis: from the full room, take out one at a time a slot a stone
+        could still be brought to with the others filled; filling in the reverse order never blocks a slot.
+        Returns the GoalRoom, or None when the room cannot be filled from its entrance.
+        """
+        directions = [direction for direction, offset in enumerate(self.offsets)
+                      if entrance + offset in cells and self.floor[entrance - offset] and entrance - offset not in cells]
+        filled = {goal for goal in self.goals if goal in cells}
+        removed = []
+        while filled:
+            for slot in sorted(filled):
+                if any(self.roomRoute(entrance, cells, direction, filled - {slot}, slot) for direction in directions):
+                    break
+            else:
+                return None
+            filled.remove(slot)
+            removed.append(slot)
+        order = tuple(reversed(removed))
+        routes = {direction: [self.roomRoute(entrance, cells, direction, set(order[:count]), order[count]) for count in range(len(order))]
+                  for direction in directions}
+        return GoalRoom(entrance, cells, order, routes)
+
+    def roomRoute(self, entrance : int, cells : frozenset, direction : int, filled : set, target : int):
+        """
+        Fewest-step moves taking a stone from the entrance to `target` inside a room, the player starting behind it
+        and the `filled` slots blocking both; (moves, walkSteps, pushes, final player cell) or None if there is none
+        """
+        start = (entrance, entrance - self.offsets[direction])
+        walkable = cells | set(start)
+        cameFrom = {start: None}
+        frontier = [start]
+        for key in frontier:
+            stone, player = key
+            if stone == target:
+                moves = []
+                while cameFrom[key] is not None:
+                    key, move = cameFrom[key]
+                    moves.append(move)
+                moves = ''.join(reversed(moves))
+                pushes = sum(move.isupper() for move in moves)
+                return moves, len(moves) - pushes, pushes, player
+            for move, push, offset in zip(MOVES, PUSHES, self.offsets):
+                nextCell = player + offset
+                if nextCell not in walkable or nextCell in filled:
+                    continue
+                if nextCell == stone:
+                    pushed = stone + offset
+                    if pushed not in cells or pushed in filled:
+                        continue
+                    nextKey = (pushed, nextCell)
+                    move = push
+                else:
+                    nextKey = (stone, nextCell)
+                if nextKey not in cameFrom:
+                    cameFrom[nextKey] = (key, move)
+                    frontier.append(nextKey)
+        return None
+
+    def roomPushes(self, stones : tuple, index : int, direction : int):
+        """
+        Goal room macro for pushing stone `index` off a room entrance and into the room, given the stones before it.
+        None when the push does not enter a room, otherwise (route, stones after the route) with the route of
+        GoalRoom.routes to the next free slot, None if the stone cannot get there and the push is not worth making.
+        """
+        room = self.roomAt.get(stones[index])
+        if room is None or direction not in room.routes:
+            return None
+        count = self.filledSlots(stones, room)
+        if count is None:
+            return None # stones got into the room some other way, so only normal pushes are safe
+        if count >= len(room.order):
+            return None, stones
+        route = room.routes[direction][count]
+        return route, stones[:index] + (room.order[count],) + stones[index + 1:]
+
+    def filledSlots(self, stones : tuple, room : GoalRoom):
+        """How many stones are in the room, None unless they stand exactly on its first slots of the fill order"""
+        count = sum(stone in room.cells for stone in stones)
+        if count > len(room.order) or not all(slot in stones for slot in room.order[:count]):
+            return None
+        return count
+
+    def findDeadSquares(self) -> bytearray:
+        """
+        Mark every floor cell from which no stone can ever reach a goal.
+        Live cells are found by pulling a stone backwards from every goal: a stone at `cell`
+        can be pulled to `cell - offset` when the player has room to stand on `cell - 2 * offset`.
+        """
+        floor = self.floor
+        live = bytearray(self.size)
+        frontier = list(self.goals)
+        for goal in frontier:
+            live[goal] = 1
+        for cell in frontier:
+            for offset in self.offsets:
+                previous = cell - offset
+                if floor[previous] and floor[previous - offset] and not live[previous]:
+                    live[previous] = 1
+                    frontier.append(previous)
+        return bytearray(isFloor and not isLive for isFloor, isLive in zip(floor, live))
+
+    def successors(self, state : State):
+        """
+        Yield every legal single step as (move, newState, pushedIndex)
+        - lowercase move and pushedIndex -1 for a walk
+        - uppercase move and the index of the pushed stone for a push, deadlocked pushes left out
+        """
+        floor = self.floor
+        stoneFloor = self.stoneFloor
+        zobristPlayer = self.zobristPlayer
+        player = state.player
+        stones = state.stones
+        walkHash = state.hash ^ zobristPlayer[player]
+        for move, push, offset in zip(MOVES, PUSHES, self.offsets):
+            nextCell = player + offset
+            if not floor[nextCell]:
+                continue
+            if nextCell not in stones:
+                yield move, State(nextCell, stones, walkHash ^ zobristPlayer[nextCell]), -1
+                continue
+            target = nextCell + offset
+            if not stoneFloor[target] or target in stones:
+                continue
+            index = stones.index(nextCell)
+            newStones = stones[:index] + (target,) + stones[index + 1:]
+            if Deadlock.isDeadlock(self, newStones, target):
+                continue
+            zobristStone = self.zobristStones[index]
+            newHash = walkHash ^ zobristPlayer[nextCell] ^ zobristStone[nextCell] ^ zobristStone[target]
+            yield push, State(nextCell, newStones, newHash), index
+
+    def predecessors(self, player : int, stones : tuple):
+        """
+        Yield every single step that leads into (player, stones) as (move, previousPlayer, previousStones),
+        the reverse of successors for a search running backwards from the goals
+        - stone identity is ignored: `stones` and `previousStones` are sorted cell tuples
+        - a lowercase move is a walk undone, an uppercase move a push undone by pulling the stone
+          in front of the player onto the player's cell
+        """
+        floor = self.floor
+        for move, push, offset in zip(MOVES, PUSHES, self.offsets):
+            previous = player - offset
+            if not floor[previous] or previous in stones:
+                continue
+            yield move, previous, stones
+            pulled = player + offset
+            if pulled in stones:
+                yield push, previous, tuple(sorted(player if stone == pulled else stone for stone in stones))
+
+    def walkDistances(self, player : int, stones : tuple) -> list:
+        """Number of walking steps from the player to every cell, -1 where the stones or walls block the way"""
+        floor = self.floor
+        offsets = self.offsets
+        distances = [-1] * self.size
+        distances[player] = 0
+        frontier = [player]
+        for cell in frontier:
+            distance = distances[cell] + 1
+            for offset in offsets:
+                neighbor = cell + offset
+                if floor[neighbor] and distances[neighbor] < 0 and neighbor not in stones:
+                    distances[neighbor] = distance
+                    frontier.append(neighbor)
+        return distances
+
+    def canonicalPlayer(self, player : int, stones : tuple) -> int:
+        """Smallest (top-left) cell of the region the player can walk to, which stands for the whole region"""
+        floor = self.floor
+        offsets = self.offsets
+        seen = {player}
+        frontier = [player]
+        for cell in frontier:
+            for offset in offsets:
+                neighbor = cell + offset
+                if floor[neighbor] and neighbor not in seen and neighbor not in stones:
+                    seen.add(neighbor)
+                    frontier.append(neighbor)
+        return min(seen)
+
+    def normalize(self, state : State) -> State:
+        """Push-level key of a state: the player is replaced by the canonical cell of its region"""
+        canonical = self.canonicalPlayer(state.player, state.stones)
+        zobristPlayer = self.zobristPlayer
+        return State(canonical, state.stones, state.hash ^ zobristPlayer[state.player] ^ zobristPlayer[canonical])
+
+    def pushSuccessors(self, state : State, player : int):
+        """
+        Yield every push available from the player's region that does not deadlock, as (push, walkSteps, pushes, newState)
+        - `state` is a push-level key and `player` the cell the player actually stands on
+        - `push` is (stone index, direction) with direction an index into MOVES
+        - `walkSteps` is the walk from `player` to the cell behind the stone
+        - `pushes` is how many times the stone is pushed, more than 1 for a macro push through a tunnel
+          (see tunnelPushes) or into a goal room (see roomPushes), so the move costs walkSteps + pushes * (1 + weight)
+        - `newState` is the normalized key after the push; the player then stands behind
+          the stone, or where a room macro left it, which pushedPlayer recovers from the push and the stones around it
+        Stones already routed to a goal room slot are never pushed again, while the room holds exactly its first slots.
+        """
+        stoneFloor = self.stoneFloor
+        stones = state.stones
+        zobristPlayer = self.zobristPlayer
+        distances = self.walkDistances(player, stones)
+        stoneHash = state.hash ^ zobristPlayer[state.player]
+        placed = set()
+        for room in self.rooms:
+            placed.update(room.order[:self.filledSlots(stones, room) or 0])
+        for index, stone in enumerate(stones):
+            if stone in placed:
+                continue
+            zobristStone = self.zobristStones[index]
+            for direction, offset in enumerate(self.offsets):
+                walkSteps = distances[stone - offset]
+                if walkSteps < 0:
+                    continue
+                room = self.roomPushes(stones, index, direction) if stone in self.roomAt else None
+                if room is not None:
+                    route, newStones = room
+                    if route is None:
+                        continue
+                    _, routeWalk, pushes, pushedPlayer = route
+                    walkSteps += routeWalk
+                    target = newStones[index]
+                else:
+                    target = stone + offset
+                    if not stoneFloor[target] or target in stones:
+                        continue
+                    newStones = stones[:index] + (target,) + stones[index + 1:]
+                    if Deadlock.isDeadlock(self, newStones, target):
+                        continue
+                    pushes, newStones = self.tunnelPushes(newStones, index, direction)
+                    target = newStones[index]
+                    pushedPlayer = target - offset
+                canonical = self.canonicalPlayer(pushedPlayer, newStones)
+                newHash = stoneHash ^ zobristStone[stone] ^ zobristStone[target] ^ zobristPlayer[canonical]
+                yield (index, direction), walkSteps, pushes, State(canonical, newStones, newHash)
+
+    def pushedPlayer(self, push : tuple, stones : tuple, previous : tuple) -> int:
+        """Cell the player stands on right after `push` turned the stones `previous` into `stones`"""
+        index, direction = push
+        if previous[index] in self.roomAt:
+            room = self.roomPushes(previous, index, direction)
+            if room is not None and room[0] is not None:
+                return room[0][3] # where the room macro left the player
+        return stones[index] - self.offsets[direction]
+
+    def walkPath(self, source : int, target : int, stones) -> str:
+        """Shortest walk between two cells as lowercase moves, None if the stones cut the way"""
+        floor = self.floor
+        cameFrom = {source: None}
+        frontier = [source]
+        for cell in frontier:
+            if cell == target:
+                break
+            for move, offset in zip(MOVES, self.offsets):
+                neighbor = cell + offset
+                if floor[neighbor] and neighbor not in cameFrom and neighbor not in stones:
+                    cameFrom[neighbor] = (cell, move)
+                    frontier.append(neighbor)
+        if target not in cameFrom:
+            return None
+        moves = []
+        while cameFrom[target] is not None:
+            target, move = cameFrom[target]
+            moves.append(move)
+        return ''.join(reversed(moves))
+
+    def expandPushes(self, pushes) -> str:
+        """Rebuild the full lowercase/uppercase move string of a sequence of (stone index, direction) pushes, tunnel macros included"""
+        player = self.startPlayer
+        stones = self.startStones
+        path = []
+        for index, direction in pushes:
+            offset = self.offsets[direction]
+            stone = stones[index]
+            path.append(self.walkPath(player, stone - offset, stones))
+            room = self.roomPushes(stones, index, direction)
+            if room is not None:
+                (moves, _, _, player), stones = room
+                path.append(moves)
+                continue
+            count, stones = self.tunnelPushes(stones[:index] + (stone + offset,) + stones[index + 1:], index, direction)
+            path.append(PUSHES[direction] * count)
+            player = stones[index] - offset
+        return ''.join(path)
+
+    def pathCost(self, path : str) -> tuple:
+        """Replay a solution path from the start and return (steps, total pushed weight)"""
+        player = self.startPlayer
+        stones = list(self.startStones)
+        weight = 0
+        for move in path:
+            offset = self.offsets[MOVES.index(move.lower())]
+            player += offset
+            if move.isupper():
+                index = stones.index(player)
+                stones[index] = player + offset
+                weight += self.weights[index]
+        return len(path), weight
+
+class Board:
+    """
+    A single mutable position for depth-first search. Moves are applied and undone in place,
+    so a search only grows its stack of moves and its visited set instead of copying states.
+    """
+    def __init__(self, level : Level) -> None:
+        self.level = level
+        self.player = level.startPlayer
+        self.stones = list(level.startStones)
+        self.occupant = [-1] * level.size # stone index standing on each cell, -1 if none
+        for index, stone in enumerate(self.stones):
+            self.occupant[stone] = index
+        self.hash = level.initialState().hash
+
+    def key(self) -> State:
+        return State(self.player, tuple(self.stones), self.hash)
+
+    def isSolved(self) -> bool:
+        return self.level.isSolved(self.stones)
+
+    def legalDirections(self) -> list:
+        """Indexes into MOVES of every walk or push available from the current position"""
+        floor = self.level.floor
+        stoneFloor = self.level.stoneFloor
+        occupant = self.occupant
+        directions = []
+        for direction, offset in enumerate(self.level.offsets):
+            nextCell = self.player + offset
+            if not floor[nextCell]:
+                continue
+            if occupant[nextCell] < 0 or (stoneFloor[nextCell + offset] and occupant[nextCell + offset] < 0):
+                directions.append(direction)
+        return directions
+
+    def apply(self, direction : int) -> int:
+        """Play a legal move in place and return the index of the pushed stone, -1 for a walk"""
+        level = self.level
+        offset = level.offsets[direction]
+        nextCell = self.player + offset
+        self.hash ^= level.zobristPlayer[self.player] ^ level.zobristPlayer[nextCell]
+        self.player = nextCell
+        index = self.occupant[nextCell]
+        if index >= 0:
+            self.__moveStone(index, nextCell, nextCell + offset)
+        return index
+
+    def undo(self, direction : int, pushedIndex : int) -> None:
+        """Take back the move returned by apply"""
+        level = self.level
+        offset = level.offsets[direction]
+        previousCell = self.player - offset
+        if pushedIndex >= 0:
+            self.__moveStone(pushedIndex, self.player + offset, self.player)
+        self.hash ^= level.zobristPlayer[self.player] ^ level.zobristPlayer[previousCell]
+        self.player = previousCell
+
+    def __moveStone(self, index : int, source : int, target : int) -> None:
+        zobristStone = self.level.zobristStones[index]
+        self.hash ^= zobristStone[source] ^ zobristStone[target]
+        self.stones[index] = target
+        self.occupant[source] = -1
+        self.occupant[target] = index
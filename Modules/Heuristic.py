@@ -0,0 +1,166 @@
+INFINITY = float('inf')
+
+def getPushDistances(level) -> list:
+    """
+    For every goal, the fewest pushes needed to bring a lone stone from each cell onto it
+    (-1 if it never can), found by pulling the stone backwards from the goal.
+    The other stones are ignored, so this is a lower bound on the real number of pushes.
+    """
+    floor = level.floor
+    tables = []
+    for goal in level.goals:
+        distances = [-1] * level.size
+        distances[goal] = 0
+        frontier = [goal]
+        for cell in frontier:
+            for offset in level.offsets:
+                previous = cell - offset
+                if floor[previous] and floor[previous - offset] and distances[previous] < 0:
+                    distances[previous] = distances[cell] + 1
+                    frontier.append(previous)
+        tables.append(distances)
+    return tables
+
+def augmentRow(costs : list, row : int, rowPotential : list, colPotential : list, owner : list) -> bool:
+    """
+    Match the free 1-based `row` along one shortest augmenting path, keeping the potentials feasible.
+    `owner` holds the 1-based row matched to each 1-based column (0 for none).
+    Returns False when the row can only be matched through infinite costs.
+    """
+    cols = len(owner) - 1
+    way = [0] * (cols + 1)
+    minSlack = [INFINITY] * (cols + 1)
+    used = [False] * (cols + 1)
+    owner[0] = row
+    col = 0
+    while owner[col] != 0:
+        used[col] = True
+        current = owner[col]
+        currentCosts = costs[current - 1]
+        currentPotential = rowPotential[current]
+        delta = INFINITY
+        nextCol = 0
+        for j in range(1, cols + 1):
+            if used[j]:
+                continue
+            slack = currentCosts[j - 1] - currentPotential - colPotential[j]
+            if slack < minSlack[j]:
+                minSlack[j] = slack
+                way[j] = col
+            if minSlack[j] < delta:
+                delta = minSlack[j]
+                nextCol = j
+        if delta == INFINITY:
+            owner[0] = 0
+            return False
+        for j in range(cols + 1):
+            if used[j]:
+                rowPotential[owner[j]] += delta
+                colPotential[j] -= delta
+            else:
+                minSlack[j] -= delta
+        col = nextCol
+    while col:
+        previous = way[col]
+        owner[col] = owner[previous]
+        col = previous
+    owner[0] = 0
+    return True
+
+def getAssignmentCost(costs : list, owner : list) -> float:
+    total = 0
+    for col in range(1, len(owner)):
+        if owner[col]:
+            total += costs[owner[col] - 1][col - 1]
+    return total
+
+def minCostAssignment(costs : list) -> tuple:
+    """
+    Hungarian algorithm on an n x m cost matrix with n <= m.
+    Returns (total cost, column assigned to each row).
+    """
+    rows = len(costs)
+    if rows == 0:
+        return 0, []
+    cols = len(costs[0])
+    rowPotential = [0] * (rows + 1)
+    colPotential = [0] * (cols + 1)
+    owner = [0] * (cols + 1)
+    for row in range(1, rows + 1):
+        if not augmentRow(costs, row, rowPotential, colPotential, owner):
+            return INFINITY, None
+    assignment = [0] * rows
+    for col in range(1, cols + 1):
+        if owner[col]:
+            assignment[owner[col] - 1] = col - 1
+    return getAssignmentCost(costs, owner), assignment
+
+class Assignment:
+    """A solved matching: its cost plus the Hungarian potentials and owners needed to repair it"""
+    __slots__ = ('total', 'rowPotential', 'colPotential', 'owner')
+
+    def __init__(self, total : float, rowPotential : list, colPotential : list, owner : list) -> None:
+        self.total = total
+        self.rowPotential = rowPotential
+        self.colPotential = colPotential
+        self.owner = owner
+
+class MatchingHeuristic:
+    """
+    Admissible estimate of the remaining cost (one per step plus the weight of every pushed stone):
+    each stone is matched to its own goal by a minimum-cost assignment, and moving stone i onto
+    goal j costs at least pushDistance(i, j) * (1 + weight of i).
+    Extra goals get zero-cost dummy rows so the matrix is square and a single augmenting path
+    repairs the assignment after one stone moves.
+    """
+    def __init__(self, level) -> None:
+        self.level = level
+        self.distances = getPushDistances(level)
+        self.padding = [[0] * len(level.goals)] * max(0, len(level.goals) - len(level.weights))
+        self.rowCache = [{} for _ in level.weights] # stone index -> {cell: cost row}
+
+    def getRow(self, index : int, stone : int) -> list:
+        cache = self.rowCache[index]
+        row = cache.get(stone)
+        if row is None:
+            weight = self.level.weights[index]
+            row = [INFINITY if distances[stone] < 0 else distances[stone] * (1 + weight) for distances in self.distances]
+            cache[stone] = row
+        return row
+
+    def getCosts(self, stones : tuple) -> list:
+        return [self.getRow(index, stone) for index, stone in enumerate(stones)] + self.padding
+
+    def solve(self, stones : tuple) -> Assignment:
+        """Assignment of a stone layout from scratch, None when no assignment can finish it"""
+        if len(stones) > len(self.level.goals):
+            return None
+        costs = self.getCosts(stones)
+        size = len(costs)
+        rowPotential, colPotential, owner = [0] * (size + 1), [0] * (size + 1), [0] * (size + 1)
+        for row in range(1, size + 1):
+            if not augmentRow(costs, row, rowPotential, colPotential, owner):
+                return None
+        return Assignment(getAssignmentCost(costs, owner), rowPotential, colPotential, owner)
+
+    def update(self, assignment : Assignment, stones : tuple, index : int) -> Assignment:
+        """Repair the parent's assignment after stone `index` moved: free its row and augment it again"""
+        costs = self.getCosts(stones)
+        owner = assignment.owner[:]
+        rowPotential = assignment.rowPotential[:]
+        colPotential = assignment.colPotential
+        row = index + 1
+        owner[owner.index(row, 1)] = 0
+        # only this row's costs changed, lowering its potential keeps every reduced cost non-negative
+        rowPotential[row] = min(cost - potential for cost, potential in zip(costs[index], colPotential[1:]))
+        if rowPotential[row] == INFINITY:
+            return None
+        colPotential = colPotential[:]
+        if not augmentRow(costs, row, rowPotential, colPotential, owner):
+            return None
+        return Assignment(getAssignmentCost(costs, owner), rowPotential, colPotential, owner)
+
+    def evaluate(self, stones : tuple) -> float:
+        """Heuristic value of a stone layout, INFINITY when no assignment can finish it"""
+        assignment = self.solve(stones)
+        return assignment.total if assignment else INFINITY
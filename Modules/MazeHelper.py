@@ -37,116 +37,144 @@ def getAvailablePosition(mazeMatrix : list) -> set:
             queue.append((row, col + 1))
     return position
 
-def getRockData(mazeMatrix : list,rockWeights : list) -> dict:
-    index = 0
-    rockData = {}
-    for row in range(len(mazeMatrix)):
-        for col in range(len(mazeMatrix[row])):
-            if isRock(mazeMatrix[row][col]):
-                rockData[(row, col)] = int(rockWeights[index])
-                index += 1
-    return rockData
-
-def getSwitchData(mazeMatrix : list) -> set:
-    switchData = set()
-    for row in range(len(mazeMatrix)):
-        for col in range(len(mazeMatrix[row])):
-            if isSwitch(mazeMatrix[row][col]):
-                switchData.add((row, col))
-    return switchData
-
-def getWallData(mazeMatrix : list) -> set:
-    wallData = set()
-    for row in range(len(mazeMatrix)):
-        for col in range(len(mazeMatrix[row])):
-            if isWall(mazeMatrix[row][col]):
-                wallData.add((row, col))
-    return wallData
-
-def getMazeSize(mazeState) -> dict:
-    # find the highest row and the longest column in the wall set
-    height = -1
-    width = -1
-    for position in mazeState.wallData:
-        height = max(height, position[0])
-        width = max(width, position[1])
-    return {'height': height + 1, 'width': width + 1}
-
-def constructMazeMatrix(maze) -> list:
-    mazeState = maze.mazeState
-    mazeSize = getMazeSize(mazeState)
-    mazeMatrix = [[' ' for _ in range(mazeSize['width'])] for _ in range(mazeSize['height'])]
-    for position in mazeState.wallData:
-        mazeMatrix[position[0]][position[1]] = '#'
-    for position in mazeState.switchData:
-        mazeMatrix[position[0]][position[1]] = '.' if position not in mazeState.rockData else '*'
-    for position in mazeState.rockData:
-        mazeMatrix[position[0]][position[1]] = '$' if position not in mazeState.switchData else '*'
-    mazeMatrix[mazeState.playerPosition[0]][mazeState.playerPosition[1]] = '@' if mazeState.playerPosition not in mazeState.switchData else '+'
+def constructMazeMatrix(level, state) -> list:
+    player, stones = state.player, state.stones
+    mazeMatrix = [[' ' for _ in range(level.cols)] for _ in range(level.rows)]
+    for row in range(level.rows):
+        for col in range(level.cols):
+            cell = level.toCell(row, col)
+            if not level.floor[cell]:
+                mazeMatrix[row][col] = '#'
+            elif cell in stones:
+                mazeMatrix[row][col] = '*' if level.isGoal[cell] else '$'
+            elif cell == player:
+                mazeMatrix[row][col] = '+' if level.isGoal[cell] else '@'
+            elif level.isGoal[cell]:
+                mazeMatrix[row][col] = '.'
     return mazeMatrix
 
 
-def printMaze(maze) -> None:
-    mazeMatrix = constructMazeMatrix(maze)
+def printMaze(level, state) -> None:
+    mazeMatrix = constructMazeMatrix(level, state)
     for row in mazeMatrix:
         print(''.join(row))
     print('-------------------------')
 
-def isMatchScenario(mazeMatrix : list, scenario : list) -> bool:
-    # create a possible scenario
+# every cell of a neighborhood is one base-3 digit of its code
+FREE, WALL, ROCK = 0, 1, 2
+DENSE_TABLE_LIMIT = 3 ** 9 # sizes up to 3x3 get a flat array, larger ones a set of codes
+
+"""
+    | |#| | \ | |$|#| \ | |$|#| \ | |$|$| \ | |$|#|
+    |#|$| | \ | |$|#| \ | |$|$| \ | |$|$| \ |#|$| |
+    | | | | \ | | | | \ | | | | \ | | | | \ | |$|#|
+"""
+SCENARIOS = [
+    [[' ','#',' '],['#','$',' '],[' ',' ',' ']],
+    [[' ','$','#'],[' ','$','#'],[' ',' ',' ']],
+    [[' ','$','#'],[' ','$','$'],[' ',' ',' ']],
+    [[' ','$','$'],[' ','$','$'],[' ',' ',' ']],
+    [[' ','$','#'],['#','$',' '],[' ','$','#']],
+]
+
+def getScenarioVariants(scenario : list) -> list:
+    # the 4 rotations of the scenario and their mirror images
     scenarioMatrix = [scenario]
     for _ in range(3):
         scenarioMatrix.append(matrix.rotateMatrix(scenarioMatrix[-1]))
     for _ in range(4):
         scenarioMatrix.append(matrix.flip_horizontal(scenarioMatrix[-4]))
-    # check if the maze matrix matches the scenario
-    for scenario in scenarioMatrix:
-        matchCount = 0
-        for i, row   in enumerate(scenario):
-            for j, col in enumerate(row):
-                if col == ' ': matchCount += 1
-                elif col == '#' and isWall(mazeMatrix[i][j]): matchCount += 1
-                elif col == '$' and isRock(mazeMatrix[i][j]): matchCount += 1
-        if matchCount == 9: return True
-    return False
-
-def isDeadlockScenario(matrix) -> bool:
-    # check if the matrix is a deadlock scenario
+    return scenarioMatrix
+
+def getScenarioCodes(scenario : list) -> list:
+    # ' ' matches anything, so it expands to every digit
+    digits = {' ': (FREE, WALL, ROCK), '#': (WALL,), '$': (ROCK,)}
+    codes = [0]
+    for row in scenario:
+        for symbol in row:
+            codes = [code * 3 + digit for code in codes for digit in digits[symbol]]
+    return codes
+
+def loadScenarioFile(filepath : str) -> list:
+    # square scenarios written with '#', '$' and ' ' (or '_' for a whole row of anything), separated by blank lines
+    scenarios = []
+    scenario = []
+    with open(filepath, 'r') as f:
+        for line in f.read().split('\n') + ['']:
+            if line.strip():
+                scenario.append(list(line.replace('_', ' ')))
+            elif scenario:
+                size = max(len(scenario), max(len(row) for row in scenario))
+                scenario += [[]] * (size - len(scenario))
+                scenarios.append([(row + [' '] * size)[:size] for row in scenario])
+                scenario = []
+    return scenarios
+
+class ScenarioTable:
     """
-        | |#| | \ | |$|#| \ | |$|#| \ | |$|$| \ | |$|#|
-        |#|$| | \ | |$|#| \ | |$|$| \ | |$|$| \ |#|$| |
-        | | | | \ | | | | \ | | | | \ | | | | \ | |$|#|
+    Deadlock scenarios of one size compiled with all their rotations and flips into a table
+    indexed by the base-3 code (free/wall/rock per cell) of a neighborhood window.
+    `anchors` are the window cells the pushed rock may occupy: the center for the built-in
+    3x3 scenarios, every rock of the scenarios otherwise.
+    Every ' ' expands to 3 codes, so larger scenarios should spell out most of their cells.
     """
-    scenarios = [
-        [[' ','#',' '],['#','$',' '],[' ',' ',' ']],
-        [[' ','$','#'],[' ','$','#'],[' ',' ',' ']],
-        [[' ','$','#'],[' ','$','$'],[' ',' ',' ']],
-        [[' ','$','$'],[' ','$','$'],[' ',' ',' ']],
-        [[' ','$','#'],['#','$',' '],[' ','$','#']],
-    ]
-    for scenario in scenarios:
-        if isMatchScenario(matrix, scenario):
-            return True
-    return False
-
-def isOnDeadlockScenario(wallData, rockData, newRockPosition, oldPosition) -> bool:
-    # get the 3x3 matrix around the new rock position
-    row, col = newRockPosition
-    matrix = []
-    elementCount = 0
-    for i in range(row - 1, row + 2):
-        row = []
-        for j in range(col - 1, col + 2):
-            if (i, j) in wallData:
-                row.append('#')
-                elementCount += 1
-            elif ((i, j) in rockData and (i,j) != oldPosition) or (i, j) == newRockPosition:
-                row.append('$')
-                elementCount += 1
-            else:
-                row.append(' ')
-        matrix.append(row)
-    if elementCount < 3:
+    def __init__(self, scenarios : list, anchors : list = None) -> None:
+        self.size = len(scenarios[0])
+        codes = set()
+        rocks = set()
+        for scenario in scenarios:
+            for variant in getScenarioVariants(scenario):
+                codes.update(getScenarioCodes(variant))
+                rocks.update((i, j) for i, row in enumerate(variant) for j, symbol in enumerate(row) if symbol == '$')
+        self.anchors = anchors if anchors is not None else sorted(rocks)
+        if 3 ** (self.size * self.size) <= DENSE_TABLE_LIMIT:
+            table = bytearray(3 ** (self.size * self.size))
+            for code in codes:
+                table[code] = 1
+            self.matches = table.__getitem__
+        else:
+            self.matches = frozenset(codes).__contains__
+
+    def getCode(self, level, stones, top : int, left : int) -> int:
+        # the window's top-left corner is given as (row, col), so it may hang off any side of the padded grid,
+        # whose cells out there count as walls
+        floor = level.floor
+        code = 0
+        for i in range(top, top + self.size):
+            for j in range(left, left + self.size):
+                cell = i * level.width + j
+                if i < 0 or i >= level.height or j < 0 or j >= level.width or not floor[cell]:
+                    code = code * 3 + WALL
+                elif cell in stones:
+                    code = code * 3 + ROCK
+                else:
+                    code = code * 3 + FREE
+        return code
+
+    def isDeadlock(self, level, stones, rockCell : int) -> bool:
+        row, col = divmod(rockCell, level.width)
+        for i, j in self.anchors:
+            if self.matches(self.getCode(level, stones, row - i, col - j)):
+                return True
         return False
-    # check if the matrix is a deadlock scenario
-    return isDeadlockScenario(matrix)
\ No newline at end of file
+
+scenarioTables = [ScenarioTable(SCENARIOS, anchors=[(1, 1)])]
+
+def addScenarioFile(filepath : str) -> None:
+    # register extra (e.g. 4x4) scenarios, checked by isOnDeadlockScenario after the built-in ones
+    scenarioTables.append(ScenarioTable(loadScenarioFile(filepath)))
+
+def isDeadlockScenario(matrix) -> bool:
+    # check if a 3x3 matrix centered on a rock is a deadlock scenario
+    code = 0
+    for row in matrix:
+        for symbol in row:
+            code = code * 3 + (WALL if isWall(symbol) else ROCK if isRock(symbol) else FREE)
+    return bool(scenarioTables[0].matches(code))
+
+def isOnDeadlockScenario(level, stones, newRockCell) -> bool:
+    # one code computation and one table read per anchor of every compiled table
+    for table in scenarioTables:
+        if table.isDeadlock(level, stones, newRockCell):
+            return True
+    return False
\ No newline at end of file
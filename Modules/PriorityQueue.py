@@ -0,0 +1,62 @@
+from collections import deque
+
+# Orders among entries sharing the same integer key
+TIE_FIFO = 'fifo' # first pushed, first popped
+TIE_LIFO = 'lifo' # last pushed, first popped
+TIE_HIGH_G = 'g' # largest cost so far first (deepest node)
+TIE_LOW_H = 'h' # smallest estimate first (key - g)
+TIE_BREAKS = (TIE_FIFO, TIE_LIFO, TIE_HIGH_G, TIE_LOW_H)
+
+class BucketQueue:
+    """
+    Dial's bucket queue for small non-negative integer keys (step counts plus stone weights):
+    one bucket per key and a cursor on the lowest non-empty one, so push is O(1) and pop only
+    walks past empty keys. Keys pushed below the cursor move it back, so any order is allowed,
+    but searches whose keys never decrease (UCS, A* with a consistent heuristic) get the best of it.
+    """
+    def __init__(self, tieBreak : str = TIE_FIFO) -> None:
+        if tieBreak not in TIE_BREAKS:
+            raise ValueError(f"Unknown tie-break '{tieBreak}', expected one of {TIE_BREAKS}")
+        self.tieBreak = tieBreak
+        self.buckets = {} # key -> deque, list or a nested LIFO BucketQueue on the sub key, depending on the tie-break
+        self.current = 0
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def push(self, key : int, item, g : int = 0) -> None:
+        """Add `item` under `key`; `g` is only read by the g and h tie-breaks"""
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = deque() if self.tieBreak == TIE_FIFO else [] if self.tieBreak == TIE_LIFO else BucketQueue(TIE_LIFO)
+            self.buckets[key] = bucket
+        if self.tieBreak in (TIE_HIGH_G, TIE_LOW_H):
+            # within one key the largest g is also the smallest key - g, so both tie-breaks use it as the sub key
+            bucket.push(key - g, item)
+        else:
+            bucket.append(item)
+        if self.count == 0 or key < self.current:
+            self.current = key
+        self.count += 1
+
+    def pop(self) -> tuple:
+        """Remove and return (key, item) with the lowest key, ties broken by the tie-break"""
+        if self.count == 0:
+            raise IndexError('pop from an empty bucket queue')
+        buckets = self.buckets
+        key = self.current
+        while key not in buckets:
+            key += 1
+        self.current = key
+        bucket = buckets[key]
+        if self.tieBreak == TIE_FIFO:
+            item = bucket.popleft()
+        elif self.tieBreak == TIE_LIFO:
+            item = bucket.pop()
+        else:
+            _, item = bucket.pop() # the nested queue's own cursor, so no scan over the sub keys
+        if not bucket:
+            del buckets[key]
+        self.count -= 1
+        return key, item
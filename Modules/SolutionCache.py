@@ -0,0 +1,120 @@
+import time
+import sqlite3
+import hashlib
+
+CACHE_FILE = 'solutions.db'
+MAX_ENTRIES = 10000 # least recently used solutions are evicted past this many
+
+def levelFingerprint(levelText : str) -> str:
+    """
+    Hash of a level file that ignores layout noise: the weights are read as integers, maze lines lose
+    their trailing whitespace and blank lines at the end are dropped, so re-saved files keep their key.
+    """
+    lines = levelText.split('\n')
+    weights = ' '.join(str(int(weight)) for weight in lines[0].split())
+    maze = [line.rstrip() for line in lines[1:]]
+    while maze and not maze[-1]:
+        maze.pop()
+    return hashlib.sha256('\n'.join([weights] + maze).encode()).hexdigest()
+
+def sourceVersion(*paths) -> str:
+    """Hash of the given source files, so editing a solver or the modules it uses invalidates its solutions"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def parseBlock(block : str) -> dict:
+    """Split an output block (name, stats line, path) into its fields, the stats keyed by their labels"""
+    name, stats, path = block.rstrip('\n').split('\n')[:3]
+    fields = dict(part.split(': ', 1) for part in stats.split(', '))
+    return {'name': name, 'stats': stats, 'path': path, 'fields': fields}
+
+class SolutionCache:
+    """
+    Solved output blocks kept in a SQLite file between runs, one row per (level, weights, algorithm,
+    solver version) under the hash of all four, so a lookup is a primary key probe.
+    Rows hold the path, cost, node count and timings of the solve that produced them.
+    """
+    def __init__(self, path : str = CACHE_FILE, maxEntries : int = MAX_ENTRIES) -> None:
+        self.path = path
+        self.maxEntries = maxEntries
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS solutions (
+                    key TEXT PRIMARY KEY,
+                    level TEXT NOT NULL,
+                    algorithm TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    steps INTEGER NOT NULL,
+                    weight INTEGER NOT NULL,
+                    nodes INTEGER NOT NULL,
+                    time_ms REAL NOT NULL,
+                    memory_mb REAL NOT NULL,
+                    stats TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    last_used REAL NOT NULL
+                )""")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS solutions_last_used ON solutions (last_used)")
+
+    @staticmethod
+    def makeKey(level : str, algorithm : str, version : str) -> str:
+        return hashlib.sha256(f"{level}\n{algorithm}\n{version}".encode()).hexdigest()
+
+    def get(self, level : str, algorithm : str, version : str):
+        """Output block cached for the level fingerprint, algorithm and version, None on a miss"""
+        key = self.makeKey(level, algorithm, version)
+        row = self.connection.execute("SELECT stats, path FROM solutions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        with self.connection:
+            self.connection.execute("UPDATE solutions SET last_used = ? WHERE key = ?", (time.time(), key))
+        return f"{algorithm}\n{row[0]}\n{row[1]}\n"
+
+    def put(self, level : str, algorithm : str, version : str, block : str) -> bool:
+        """Store a solver's output block; blocks without a solution are skipped since they depend on time limits"""
+        parsed = parseBlock(block)
+        fields = parsed['fields']
+        if parsed['path'] == 'No solution':
+            return False
+        row = (self.makeKey(level, algorithm, version), level, algorithm, version,
+               int(fields['Steps']), int(fields['Weight']), int(fields['Nodes']),
+               float(fields['Time (ms)'].rstrip('s')), float(fields['Memory (MB)']), # DFS suffixes its time with 's'
+               parsed['stats'], parsed['path'], time.time())
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+        self.evict()
+        return True
+
+    def evict(self) -> int:
+        """Drop the least recently used rows above maxEntries, returns how many went"""
+        count = self.connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+        extra = count - self.maxEntries
+        if extra <= 0:
+            return 0
+        with self.connection:
+            self.connection.execute("DELETE FROM solutions WHERE key IN "
+                                    "(SELECT key FROM solutions ORDER BY last_used LIMIT ?)", (extra,))
+        return extra
+
+    def invalidate(self, algorithm : str = None, level : str = None) -> int:
+        """Remove the solutions of one algorithm, one level fingerprint, both, or everything, returns how many"""
+        conditions = []
+        values = []
+        if algorithm is not None:
+            conditions.append("algorithm = ?")
+            values.append(algorithm)
+        if level is not None:
+            conditions.append("level = ?")
+            values.append(level)
+        query = "DELETE FROM solutions" + (" WHERE " + " AND ".join(conditions) if conditions else "")
+        with self.connection:
+            return self.connection.execute(query, values).rowcount
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+    def close(self) -> None:
+        self.connection.close()
@@ -0,0 +1,167 @@
+from Algorithms import bfs, dfs, ucs, a_star, ida_star
+from Modules.Canonical import CanonicalLevel
+from Modules.SolutionCache import parseBlock, sourceVersion
+import os
+import sys
+import glob
+import time
+import shutil
+import tempfile
+import functools
+import multiprocessing
+
+try:
+    import resource  # POSIX only, memory limits are skipped elsewhere
+except ImportError:
+    resource = None
+
+# Output block name -> function writing that block for one test case, in output order
+ALGORITHMS = {
+    'BFS': bfs.remake_output,
+    'DFS': dfs.remake_output,
+    'UCS': ucs.remake_output,
+    'A*': a_star.remake_output,
+    'IDA*': ida_star.remake_output,
+}
+
+# Exit codes of a batch: the worst job outcome wins
+EXIT_OK = 0
+EXIT_FAILED = 1  # a job crashed or ran out of memory
+EXIT_TIMEOUT = 2  # a job was killed at its wall-clock limit
+
+@functools.lru_cache(maxsize=None)
+def solver_version(algorithm):
+    """Hash of the algorithm's module and of every shared module, the version part of its cache keys"""
+    module = sys.modules[ALGORITHMS[algorithm].__module__]
+    return sourceVersion(module.__file__, *sorted(glob.glob(os.path.join(os.path.dirname(__file__), 'Modules', '*.py'))))
+
+def canonical_level(test_case):
+    return CanonicalLevel.fromFile(os.path.join('Test_cases', f'input-{test_case}.txt'))
+
+def translate_block(block, translate):
+    """the block with its path passed through `translate`, a move mapping of CanonicalLevel"""
+    parsed = parseBlock(block)
+    path = parsed['path'] if parsed['path'] == 'No solution' else translate(parsed['path'])
+    return f"{parsed['name']}\n{parsed['stats']}\n{path}\n"
+
+def cached_block(cache, level, algorithm):
+    """the cached block of the algorithm on any symmetric copy of the level, mapped onto this copy; None on a miss"""
+    block = cache.get(level.key, algorithm, solver_version(algorithm))
+    return None if block is None else translate_block(block, level.fromCanonical)
+
+def store_block(cache, level, algorithm, block):
+    # solutions are stored as moves on the canonical level
+    cache.put(level.key, algorithm, solver_version(algorithm), translate_block(block, level.toCanonical))
+
+def remake_cached(algorithm, test_case, cache):
+    """Append one algorithm's block for a test case to Outputs/ in this process, solving only on a cache miss"""
+    level = canonical_level(test_case)
+    block = cached_block(cache, level, algorithm)
+    output_file = os.path.join('Outputs', f'output-{test_case}.txt')
+    if block is not None:
+        with open(output_file, 'a') as f:
+            f.write(block)
+        return
+    start = os.path.getsize(output_file) if os.path.exists(output_file) else 0
+    ALGORITHMS[algorithm](test_case)
+    with open(output_file) as f:
+        f.seek(start)
+        store_block(cache, level, algorithm, f.read())
+
+def run_job(algorithm, test_case, memory_limit, work_dir, connection):
+    """Run one (algorithm, test case) job in the private `work_dir` and send back (status, output block)"""
+    project_dir = os.getcwd()
+    try:
+        # the solvers read Test_cases/ and append to Outputs/ relative to the working directory
+        os.makedirs(os.path.join(work_dir, 'Test_cases'))
+        os.makedirs(os.path.join(work_dir, 'Outputs'))
+        shutil.copy(os.path.join(project_dir, 'Test_cases', f'input-{test_case}.txt'), os.path.join(work_dir, 'Test_cases'))
+        os.chdir(work_dir)
+        sys.stdout = open(os.devnull, 'w')  # keep the solvers' progress prints out of the batch log
+
+        if memory_limit and resource is not None:
+            limit = memory_limit * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+        ALGORITHMS[algorithm](test_case)
+        with open(os.path.join('Outputs', f'output-{test_case}.txt')) as f:
+            connection.send(('ok', f.read()))
+    except MemoryError:
+        connection.send(('memory', ''))
+    except Exception as e:
+        connection.send(('error', repr(e)))
+    finally:
+        os.chdir(project_dir)
+
+def no_solution_block(algorithm, seconds):
+    return f"{algorithm}\nSteps: 0, Weight: 0, Nodes: 0, Time (ms): {seconds * 1000:.2f}, Memory (MB): 0.00\nNo solution\n"
+
+def run_batch(test_cases, algorithms, jobs, timeout, memory_limit, cache=None):
+    """
+    Run every (test case, algorithm) job in its own process, at most `jobs` at a time, each killed after
+    `timeout` seconds and limited to `memory_limit` MB. Blocks are appended to Outputs/ in test case then
+    algorithm order whatever order the jobs finish in; failed jobs get a "No solution" block.
+    With a SolutionCache, jobs already solved for the same level (or a rotated or mirrored copy of it)
+    and solver version are not run again and new solutions are stored. Returns EXIT_OK, EXIT_FAILED or EXIT_TIMEOUT.
+    """
+    pending = []
+    running = {}  # job -> (process, result pipe, work folder, start time)
+    results = {}  # job -> (status, output block, seconds)
+    levels = {}  # test case -> CanonicalLevel, only with a cache
+    for test_case in test_cases:
+        if cache is not None:
+            levels[test_case] = canonical_level(test_case)
+        for algorithm in algorithms:
+            block = cached_block(cache, levels[test_case], algorithm) if cache is not None else None
+            if block is None:
+                pending.append((test_case, algorithm))
+            else:
+                results[(test_case, algorithm)] = ('ok', block, 0)
+                print(f"{algorithm} on case {test_case}: cached")
+
+    while pending or running:
+        while pending and len(running) < jobs:
+            job = pending.pop(0)
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            work_dir = tempfile.mkdtemp(prefix='sokoban-')  # removed here, a killed job cannot clean up
+            process = multiprocessing.Process(target=run_job, args=(job[1], job[0], memory_limit, work_dir, sender), daemon=True)
+            process.start()
+            sender.close()
+            running[job] = (process, receiver, work_dir, time.time())
+
+        for job, (process, receiver, work_dir, start_time) in list(running.items()):
+            seconds = time.time() - start_time
+            if receiver.poll():
+                try:
+                    status, block = receiver.recv()
+                except EOFError:
+                    status, block = 'error', f'exit code {process.exitcode}'
+            elif not process.is_alive():
+                # killed without reporting, most likely by the operating system for memory
+                status, block = 'error', f'exit code {process.exitcode}'
+            elif seconds > timeout:
+                process.terminate()
+                status, block = 'timeout', ''
+            else:
+                continue
+            process.join()
+            receiver.close()
+            shutil.rmtree(work_dir, ignore_errors=True)
+            del running[job]
+            results[job] = (status, block, seconds)
+            if status == 'ok' and cache is not None:
+                store_block(cache, levels[job[0]], job[1], block)
+            print(f"{job[1]} on case {job[0]}: {status} ({seconds:.2f}s)")
+        time.sleep(0.01)
+
+    exit_code = EXIT_OK
+    for test_case in test_cases:
+        with open(os.path.join('Outputs', f'output-{test_case}.txt'), 'a') as f:
+            for algorithm in algorithms:
+                status, block, seconds = results[(test_case, algorithm)]
+                if status == 'ok':
+                    f.write(block)
+                    continue
+                f.write(no_solution_block(algorithm, seconds))
+                exit_code = max(exit_code, EXIT_TIMEOUT if status == 'timeout' else EXIT_FAILED)
+    return exit_code
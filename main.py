@@ -1,6 +1,9 @@
-from Algorithms import bfs, dfs, ucs, a_star
+import batch
+from Modules.SolutionCache import SolutionCache, CACHE_FILE, MAX_ENTRIES
 import os
+import sys
 import glob
+import argparse
 
 def clear_output_folder():
     # Get the path to the Outputs folder
@@ -22,22 +25,34 @@ def clear_output_folder():
             print(f"Error removing {file}: {e}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Run every algorithm on every test case")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help="jobs run at the same time")
+    parser.add_argument('--timeout', type=float, default=120, help="wall-clock limit of one job in seconds")
+    parser.add_argument('--memory', type=int, default=4096, help="memory limit of one job in MB (POSIX only)")
+    parser.add_argument('--cache', default=CACHE_FILE, help="solution cache file")
+    parser.add_argument('--cache-size', type=int, default=MAX_ENTRIES, help="solutions kept in the cache")
+    parser.add_argument('--no-cache', action='store_true', help="solve everything without reading or writing the cache")
+    parser.add_argument('--clear-cache', action='store_true', help="empty the cache before running")
+    args = parser.parse_args()
+
     print("Clearing previous output files...")
     clear_output_folder()
+
+    cache = None
+    if not args.no_cache:
+        cache = SolutionCache(args.cache, args.cache_size)
+        if args.clear_cache:
+            print(f"Cleared {cache.invalidate()} cached solutions")
     
-    print("\nRunning BFS algorithm...")
-    bfs.main()
-    
-    print("Running DFS algorithm...")
-    dfs.main()
-    
-    print("Running UCS algorithm...")
-    ucs.main()
-    
-    print("Running A* algorithm...")
-    a_star.main()
+    print(f"\nRunning {', '.join(batch.ALGORITHMS)} on {args.jobs} processes...")
+    try:
+        exit_code = batch.run_batch(range(1, 11), list(batch.ALGORITHMS), args.jobs, args.timeout, args.memory, cache)
+    finally:
+        if cache is not None:
+            cache.close()
     
-    print("\nAll algorithms completed!")
+    print("\nAll algorithms completed!" if exit_code == batch.EXIT_OK else f"\nCompleted with failures (exit code {exit_code})")
+    return exit_code
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    sys.exit(main())
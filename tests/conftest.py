@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pytest
+
+# the solvers import `Modules` and `Algorithms` from the repository root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from Modules.Engine import MOVES
+
+def replaySolution(level, path):
+    """True when `path` is a legal move string from the level's start that leaves every stone on a goal"""
+    player = level.startPlayer
+    stones = list(level.startStones)
+    for move in path:
+        offset = level.offsets[MOVES.index(move.lower())]
+        player += offset
+        if not level.floor[player] or (player in stones) != move.isupper():
+            return False
+        if move.isupper():
+            target = player + offset
+            if not level.floor[target] or target in stones:
+                return False
+            stones[stones.index(player)] = target
+    return level.isSolved(tuple(stones))
+
+@pytest.fixture
+def replay():
+    return replaySolution
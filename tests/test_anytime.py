@@ -0,0 +1,29 @@
+import os
+
+import pytest
+
+from Algorithms.a_star import A_Star_Search
+from Modules.Engine import Level
+
+from conftest import ROOT
+
+@pytest.mark.parametrize('test_case', [4, 6, 9])
+def test_anytime_solutions_improve_down_to_the_optimum(replay, test_case):
+    level = Level.fromFile(os.path.join(ROOT, 'Test_cases', f'input-{test_case}.txt'))
+    calls = []
+    search = A_Star_Search(level)
+    nodes, _ = search.search_anytime(on_solution=lambda actions, cost, bound: calls.append((actions, cost, bound)))
+    assert replay(level, search.get_actions(nodes[-1]))
+
+    # one callback per published solution, each cheaper or proven closer to optimal than the one before
+    assert [(cost, bound) for _, cost, bound in calls] == [(cost, bound) for cost, bound, _ in search.solutions]
+    for (_, cost, bound), (_, nextCost, nextBound) in zip(calls, calls[1:]):
+        assert nextCost <= cost
+        assert nextCost < cost or nextBound < bound
+    for actions, cost, _ in calls:
+        assert replay(level, actions) and sum(level.pathCost(actions)) == cost
+
+    optimal = A_Star_Search(level)
+    optimalNodes, _ = optimal.search()
+    assert calls[-1][1] == sum(level.pathCost(optimal.get_actions(optimalNodes[-1])))
+    assert search.bound == 1
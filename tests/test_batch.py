@@ -0,0 +1,85 @@
+import os
+import shutil
+
+import pytest
+
+import batch
+from Modules import MatrixHelper
+from Modules.Engine import Level
+from Modules.SolutionCache import SolutionCache, parseBlock
+
+from conftest import ROOT
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """A project folder with empty Test_cases/ and Outputs/, as run_batch expects in the working directory"""
+    os.makedirs(tmp_path / 'Test_cases')
+    os.makedirs(tmp_path / 'Outputs')
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+def copyCase(source, test_case):
+    shutil.copy(os.path.join(ROOT, 'Test_cases', f'input-{source}.txt'), os.path.join('Test_cases', f'input-{test_case}.txt'))
+
+def readBlocks(test_case):
+    with open(os.path.join('Outputs', f'output-{test_case}.txt')) as f:
+        lines = f.read().rstrip('\n').split('\n')
+    return [parseBlock('\n'.join(lines[start:start + 3])) for start in range(0, len(lines), 3)]
+
+def test_solved_jobs_exit_ok_in_algorithm_order(workspace, replay):
+    copyCase(4, 1)
+    copyCase(2, 2)
+    assert batch.run_batch([1, 2], ['UCS', 'A*'], 2, 60, 0) == batch.EXIT_OK
+    for test_case in (1, 2):
+        blocks = readBlocks(test_case)
+        assert [block['name'] for block in blocks] == ['UCS', 'A*']
+        level = Level.fromFile(os.path.join('Test_cases', f'input-{test_case}.txt'))
+        assert all(replay(level, block['path']) for block in blocks)
+
+def test_crashed_job_exits_failed(workspace):
+    copyCase(4, 1)
+    with open(os.path.join('Test_cases', 'input-1.txt')) as f:
+        text = f.read()
+    with open(os.path.join('Test_cases', 'input-1.txt'), 'w') as f:
+        f.write('1 ' + text)  # one weight too many
+    assert batch.run_batch([1], ['A*'], 1, 60, 0) == batch.EXIT_FAILED
+    assert readBlocks(1)[0]['path'] == 'No solution'
+
+@pytest.mark.skipif(batch.resource is None, reason="memory limits need the resource module")
+def test_job_over_its_memory_limit_exits_failed(workspace):
+    copyCase(10, 1)
+    assert batch.run_batch([1], ['BFS'], 1, 60, 1) == batch.EXIT_FAILED
+    assert readBlocks(1)[0]['path'] == 'No solution'
+
+def test_timeout_wins_over_failure(workspace):
+    copyCase(10, 1)
+    copyCase(4, 2)
+    with open(os.path.join('Test_cases', 'input-2.txt'), 'a') as f:
+        f.write('\n#$#\n')  # a stone without a weight
+    assert batch.run_batch([1, 2], ['BFS'], 2, 0.2, 0) == batch.EXIT_TIMEOUT
+    assert readBlocks(1)[0]['path'] == 'No solution'
+    assert readBlocks(2)[0]['path'] == 'No solution'
+
+def test_cache_serves_a_rotated_copy(workspace, capsys, replay):
+    copyCase(4, 1)
+    with open(os.path.join('Test_cases', 'input-1.txt')) as f:
+        lines = f.read().rstrip('\n').split('\n')
+    weights = ' '.join(['7'] * len(lines[0].split()))  # equal weights, so the rotated stone order needs no reordering
+    width = max(len(line) for line in lines[1:])
+    rotated = [''.join(row).rstrip() for row in MatrixHelper.rotateMatrix([line.ljust(width) for line in lines[1:]])]
+    for test_case, maze in ((1, lines[1:]), (2, rotated)):
+        with open(os.path.join('Test_cases', f'input-{test_case}.txt'), 'w') as f:
+            f.write('\n'.join([weights] + maze) + '\n')
+
+    cache = SolutionCache(str(workspace / 'solutions.db'))
+    try:
+        assert batch.run_batch([1], ['A*'], 1, 60, 0, cache) == batch.EXIT_OK
+        assert len(cache) == 1
+        capsys.readouterr()
+        assert batch.run_batch([2], ['A*'], 1, 60, 0, cache) == batch.EXIT_OK
+        assert 'A* on case 2: cached' in capsys.readouterr().out
+    finally:
+        cache.close()
+    first, second = readBlocks(1)[0], readBlocks(2)[0]
+    assert second['fields']['Weight'] == first['fields']['Weight']
+    assert replay(Level.fromFile(os.path.join('Test_cases', 'input-2.txt')), second['path'])
@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+from Algorithms import bfs
+from Modules.Engine import Level
+from Modules.SolutionCache import parseBlock
+
+from conftest import ROOT
+
+def caseFile(test_case):
+    return os.path.join(ROOT, 'Test_cases', f'input-{test_case}.txt')
+
+def runBfs(tmp_path, inputFile, **options):
+    """Run one BFS mode and return its parsed output block"""
+    outputFile = tmp_path / f'output-{len(os.listdir(tmp_path))}.txt'
+    bfs.MazeSolver(inputFile, str(outputFile), **options).bfs()
+    return parseBlock(outputFile.read_text())
+
+def checkSameAsBfs(tmp_path, replay, inputFile, **options):
+    level = Level.fromFile(inputFile)
+    plain = runBfs(tmp_path, inputFile)
+    other = runBfs(tmp_path, inputFile, **options)
+    assert other['fields']['Steps'] == plain['fields']['Steps']
+    assert replay(level, other['path'])
+    steps, weight = level.pathCost(other['path'])
+    assert (str(steps), str(weight)) == (other['fields']['Steps'], other['fields']['Weight'])
+
+@pytest.mark.parametrize('test_case', [1, 2, 4, 9])
+def test_bidirectional_matches_bfs(tmp_path, replay, test_case):
+    checkSameAsBfs(tmp_path, replay, caseFile(test_case), bidirectional=True)
+
+@pytest.mark.parametrize('test_case', [1, 4, 8])
+def test_layered_bfs_with_two_workers_matches_bfs(tmp_path, replay, monkeypatch, test_case):
+    monkeypatch.setattr(bfs, 'PARALLEL_LAYER', 1)  # send every layer through the pool
+    checkSameAsBfs(tmp_path, replay, caseFile(test_case), workers=2)
+
+# The stone in the bottom pocket can only be pushed up from the cell under it, which the player never reaches
+UNSOLVABLE = [
+    '1 1',
+    '########',
+    '#.    .#',
+    '# $  @ #',
+    '#      #',
+    '###$####',
+    '### ####',
+    '########',
+]
+
+@pytest.mark.parametrize('test_case', [1, 4, 9])
+def test_external_bfs_matches_bfs(tmp_path, replay, test_case):
+    checkSameAsBfs(tmp_path, replay, caseFile(test_case), external=True)
+
+def test_external_bfs_ends_on_unsolvable_level(tmp_path):
+    inputFile = tmp_path / 'input.txt'
+    inputFile.write_text('\n'.join(UNSOLVABLE) + '\n')
+    plain = runBfs(tmp_path, str(inputFile))
+    external = runBfs(tmp_path, str(inputFile), external=True)
+    assert plain['path'] == external['path'] == 'No solution'
+    # ended on an empty layer, well before the 60 s timeout
+    assert float(external['fields']['Time (ms)']) < 5000
+
+def test_visited_table_probes_past_collisions():
+    table = bfs.SharedVisitedTable(4)
+    try:
+        # keys sharing a first slot, which the later ones only find by probing on
+        buckets = {}
+        for key in range(1000):
+            buckets.setdefault(table.first_slot(key), []).append(key)
+        colliding = max(buckets.values(), key=len)[:3]
+        assert len(colliding) == 3
+        for key in colliding:
+            table.add(key)
+        table.add(colliding[0])
+        assert table.count == 3
+        assert all(table.contains(key) for key in colliding)
+
+        # fill to 15 of 16 slots: every lookup still ends, on its key or on the last empty slot
+        others = [key for key in range(1000) if key not in colliding][:12]
+        for key in others:
+            table.add(key)
+        assert table.count == 15
+        assert all(table.contains(key) for key in colliding + others)
+        assert not any(table.contains(key) for key in range(1000, 1100))
+
+        table = table.grown()
+        assert table.capacity == 32 and table.count == 15
+        assert all(table.contains(key) for key in colliding + others)
+    finally:
+        table.close(unlink=True)
@@ -0,0 +1,70 @@
+import os
+
+from Algorithms.a_star import A_Star_Search
+from Modules import MatrixHelper, MazeHelper
+from Modules.Canonical import CanonicalLevel
+from Modules.Engine import Level
+
+from conftest import ROOT
+
+def readCase(test_case):
+    with open(os.path.join(ROOT, 'Test_cases', f'input-{test_case}.txt')) as f:
+        lines = f.read().split('\n')
+    maze = [line.rstrip() for line in lines[1:] if line.strip()]
+    width = max(len(line) for line in maze)
+    return [list(line.ljust(width)) for line in maze], [int(weight) for weight in lines[0].split()]
+
+def symmetricCopies(mazeMatrix, weights):
+    """The 8 rotations and mirror images of a level, each stone keeping its own weight"""
+    labels = []
+    index = 0
+    for row in mazeMatrix:
+        labels.append([])
+        for symbol in row:
+            labels[-1].append(weights[index] if MazeHelper.isRock(symbol) else None)
+            index += MazeHelper.isRock(symbol)
+    copies = []
+    for mirrored in (False, True):
+        maze = MatrixHelper.flip_horizontal(mazeMatrix) if mirrored else mazeMatrix
+        weightGrid = MatrixHelper.flip_horizontal(labels) if mirrored else labels
+        for _ in range(4):
+            copies.append((maze, [weight for row in weightGrid for weight in row if weight is not None]))
+            maze = MatrixHelper.rotateMatrix(maze)
+            weightGrid = MatrixHelper.rotateMatrix(weightGrid)
+    return copies
+
+def test_symmetric_copies_share_one_key():
+    mazeMatrix, weights = readCase(1)
+    keys = {CanonicalLevel(maze, copyWeights).key for maze, copyWeights in symmetricCopies(mazeMatrix, weights)}
+    assert len(keys) == 1
+
+def test_move_translation_round_trips():
+    mazeMatrix, weights = readCase(1)
+    moves = 'udlrUDLR' * 3
+    for maze, copyWeights in symmetricCopies(mazeMatrix, weights):
+        canonical = CanonicalLevel(maze, copyWeights)
+        assert canonical.fromCanonical(canonical.toCanonical(moves)) == moves
+        assert sorted(canonical.toCanonical('udlr')) == sorted('udlr')
+
+def test_canonical_solution_solves_every_copy(replay):
+    mazeMatrix, weights = readCase(4)
+    copies = symmetricCopies(mazeMatrix, weights)
+    canonical = CanonicalLevel(*copies[0])
+    search = A_Star_Search(canonical.makeLevel())
+    solution, _ = search.search()
+    path = search.get_actions(solution[-1])
+    for maze, copyWeights in copies:
+        level = Level([''.join(row) for row in maze], copyWeights)
+        translated = CanonicalLevel(maze, copyWeights).fromCanonical(path)
+        assert replay(level, translated)
+        assert level.pathCost(translated) == canonical.makeLevel().pathCost(path)
+
+def test_walled_in_stone_changes_the_key():
+    solvable = "1\n#########\n#@ $ . ##\n#########\n"
+    walledIn = "1 1\n#########\n#@ $ . ##\n#########\n###$#####\n#########\n"
+    assert CanonicalLevel.fromText(solvable).key != CanonicalLevel.fromText(walledIn).key
+    assert CanonicalLevel.fromText(walledIn).toText().count('$') == 2
+
+def test_unreachable_empty_floor_is_trimmed():
+    assert CanonicalLevel.fromText("1\n#########\n#@ $ . ##\n#########\n### #####\n#########\n").key == \
+        CanonicalLevel.fromText("1\n#########\n#@ $ . ##\n#########\n").key
@@ -0,0 +1,53 @@
+from Modules import Deadlock
+from Modules.Engine import Level
+
+def levelAndStones(rows):
+    level = Level(rows, [1] * sum(row.count('$') + row.count('*') for row in rows))
+    return level, level.startStones
+
+def test_stone_frozen_on_both_axes_off_a_goal():
+    level, stones = levelAndStones([
+        "######",
+        "#$  .#",
+        "#  @ #",
+        "######",
+    ])
+    assert Deadlock.isFreezeDeadlock(level, stones, stones[0])
+
+def test_frozen_block_on_goals_is_not_a_deadlock():
+    level, stones = levelAndStones([
+        "#######",
+        "#**   #",
+        "#**  @#",
+        "#     #",
+        "#######",
+    ])
+    for stone in stones:
+        assert not Deadlock.isFreezeDeadlock(level, stones, stone)
+
+def test_stones_blocking_each_other_through_the_assumed_set():
+    # neither stone is frozen alone: each one only counts as blocked while the other is assumed to be a wall
+    level, stones = levelAndStones([
+        "########",
+        "#  $$ .#",
+        "#   @ .#",
+        "########",
+    ])
+    left, right = stones
+    assert not level.dead[left - 1] and not level.dead[right + 1]
+    frozen = []
+    assert Deadlock.isFrozen(level, stones, left, set(), frozen)
+    assert sorted(frozen) == sorted(stones)
+    assert Deadlock.isFreezeDeadlock(level, stones, left)
+
+def test_stone_blocked_sideways_can_still_move_up_and_down():
+    level, stones = levelAndStones([
+        "#####",
+        "# . #",
+        "##$##",
+        "# @ #",
+        "#####",
+    ])
+    stone = stones[0]
+    assert Deadlock.isBlocked(level, stones, stone, 1, {stone}, [])
+    assert not Deadlock.isFreezeDeadlock(level, stones, stone)
@@ -0,0 +1,72 @@
+import time
+
+from Algorithms import bfs
+from Algorithms.a_star import A_Star_Search
+from Modules.Engine import Level
+
+# four goals behind the single entrance at (4, 4), the cell below it the room's doorstep at (5, 4)
+ROOM_LEVEL = [
+    "#########",
+    "#..    ##",
+    "#..    ##",
+    "#      ##",
+    "#### ####",
+    "#  $ $  #",
+    "# $ $ @ #",
+    "#       #",
+    "#########",
+]
+WEIGHTS = [3, 5, 7, 2]
+UP = 0
+
+def makeLevel():
+    level = Level(ROOM_LEVEL, WEIGHTS)
+    assert len(level.rooms) == 1
+    return level, level.rooms[0]
+
+def test_room_is_found_with_a_full_fill_order():
+    level, room = makeLevel()
+    assert sorted(level.toPosition(slot) for slot in room.order) == [(1, 1), (1, 2), (2, 1), (2, 2)]
+    assert all(route is not None for route in room.routes[UP])
+
+def test_push_searches_solve_through_the_room(replay, tmp_path):
+    level, _ = makeLevel()
+    search = A_Star_Search(level, push_level=True)
+    solution, _ = search.search()
+    assert replay(level, search.get_actions(solution[-1]))
+
+    level_file = tmp_path / 'input.txt'
+    level_file.write_text(' '.join(map(str, WEIGHTS)) + '\n' + '\n'.join(ROOM_LEVEL) + '\n')
+    output_file = tmp_path / 'output.txt'
+    bfs.MazeSolver(str(level_file), str(output_file), True).bfs()
+    assert replay(level, output_file.read_text().split('\n')[2])
+
+def test_macro_needs_the_room_to_hold_exactly_its_first_slots():
+    level, room = makeLevel()
+    entrance = room.entrance
+    outside = level.startStones[2:]
+    # the first slot filled: the next stone on the entrance is routed to the second slot
+    route, stones = level.roomPushes((entrance, room.order[0]) + outside, 0, UP)
+    assert route is not None and stones[0] == room.order[1]
+    assert level.pushedPlayer((0, UP), stones, (entrance, room.order[0]) + outside) == route[3]
+
+    # a stone that got in some other way: plain pushes only, and stones on slots may still move
+    offPrefix = (entrance, room.order[1]) + outside
+    assert level.filledSlots(offPrefix, room) is None
+    assert level.roomPushes(offPrefix, 0, UP) is None
+    pushed = (entrance + level.offsets[UP],) + offPrefix[1:]
+    assert level.pushedPlayer((0, UP), pushed, offPrefix) == entrance
+    player = level.toCell(3, 6)
+    pushedStones = {push[0] for push, _, _, _ in level.pushSuccessors(level.normalize(level.makeState(player, offPrefix)), player)}
+    assert 1 in pushedStones
+
+def test_large_open_level_builds_quickly():
+    size = 50
+    maze = ["#" * size] + ["#" + " " * (size - 2) + "#" for _ in range(size - 2)] + ["#" * size]
+    maze[1] = "#@$." + " " * (size - 5) + "#"
+    start = time.perf_counter()
+    level = Level(maze, [1])
+    assert 'rooms' not in vars(level) # only found when a push-level search asks for them
+    assert level.rooms == [] and level.roomAt == {}
+    # one linear pass: the old flood fill from every cell took seconds here
+    assert time.perf_counter() - start < 1.0
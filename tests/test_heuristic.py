@@ -0,0 +1,126 @@
+import itertools
+import os
+import random
+
+from Modules.Engine import Level
+from Modules.Heuristic import INFINITY, MatchingHeuristic, minCostAssignment
+
+from conftest import ROOT
+
+def bruteForce(costs):
+    """Cheapest assignment of every row to its own column, trying every permutation"""
+    rows, cols = len(costs), len(costs[0])
+    return min(sum(costs[row][col] for row, col in enumerate(columns)) for columns in itertools.permutations(range(cols), rows))
+
+def randomCosts(generator, rows, cols):
+    return [[INFINITY if generator.random() < 0.3 else generator.randrange(20) for _ in range(cols)] for _ in range(rows)]
+
+def test_assignment_is_the_minimum_over_all_permutations():
+    generator = random.Random(8)
+    for _ in range(300):
+        rows = generator.randint(1, 5)
+        costs = randomCosts(generator, rows, generator.randint(rows, 6))
+        total, assignment = minCostAssignment(costs)
+        expected = bruteForce(costs)
+        assert total == expected
+        if expected == INFINITY:
+            assert assignment is None
+        else:
+            assert len(set(assignment)) == rows
+            assert sum(costs[row][col] for row, col in enumerate(assignment)) == total
+
+# three stones of different weights; the one at (4, 1) is stuck in a corner and reaches no goal
+WEIGHTED = [
+    "#######",
+    "#.   .#",
+    "# $ $ #",
+    "#  . @#",
+    "#$    #",
+    "#######",
+]
+
+def test_weighted_matching_against_brute_force():
+    level = Level(WEIGHTED, [4, 1, 9])
+    heuristic = MatchingHeuristic(level)
+    stones = level.startStones
+    costs = [[INFINITY if distances[stone] < 0 else distances[stone] * (1 + weight) for distances in heuristic.distances]
+             for stone, weight in zip(stones, level.weights)]
+    assert all(cost == INFINITY for cost in costs[2])
+    assert heuristic.solve(stones) is None
+    assert heuristic.evaluate(stones) == INFINITY
+
+    generator = random.Random(9)
+    floorCells = [cell for cell in range(level.size) if level.floor[cell]]
+    for _ in range(200):
+        layout = tuple(generator.sample(floorCells, 3))
+        assignment = heuristic.solve(layout)
+        costs = heuristic.getCosts(layout)
+        expected = bruteForce(costs)
+        assert (assignment.total if assignment else INFINITY) == expected
+
+def test_estimate_never_exceeds_the_optimal_cost():
+    # optimal step + weight costs of the bundled cases, from step-level A* and UCS
+    for test_case, optimal in ((1, 429), (2, 424), (4, 159), (9, 473)):
+        level = Level.fromFile(os.path.join(ROOT, 'Test_cases', f'input-{test_case}.txt'))
+        assert MatchingHeuristic(level).evaluate(level.startStones) <= optimal
+
+def test_update_after_every_push_matches_a_fresh_solve():
+    generator = random.Random(9)
+    for test_case in (1, 4, 5):
+        level = Level.fromFile(os.path.join(ROOT, 'Test_cases', f'input-{test_case}.txt'))
+        heuristic = MatchingHeuristic(level)
+        for _ in range(20):
+            state = level.initialState()
+            assignment = heuristic.solve(state.stones)
+            for _ in range(60):
+                successors = list(level.successors(state))
+                if not successors:
+                    break
+                _, state, pushedIndex = generator.choice(successors)
+                if pushedIndex < 0:
+                    continue
+                assignment = heuristic.update(assignment, state.stones, pushedIndex)
+                fresh = heuristic.solve(state.stones)
+                assert (assignment is None) == (fresh is None)
+                if assignment is None:
+                    break
+                assert assignment.total == fresh.total
+
+def test_update_against_brute_force_on_small_layouts():
+    level = Level([
+        "#######",
+        "#.   .#",
+        "# $ $ #",
+        "#  . @#",
+        "#  $  #",
+        "#######",
+    ], [4, 1, 9])
+    heuristic = MatchingHeuristic(level)
+    generator = random.Random(10)
+    floorCells = [cell for cell in range(level.size) if level.floor[cell]]
+    for _ in range(300):
+        layout = tuple(generator.sample(floorCells, 3))
+        assignment = heuristic.solve(layout)
+        if assignment is None:
+            continue
+        index = generator.randrange(3)
+        moved = layout[:index] + (generator.choice([cell for cell in floorCells if cell not in layout]),) + layout[index + 1:]
+        repaired = heuristic.update(assignment, moved, index)
+        expected = bruteForce(heuristic.getCosts(moved))
+        assert (repaired.total if repaired else INFINITY) == expected
+
+def test_update_gives_up_when_a_stone_reaches_no_free_goal():
+    level = Level([
+        "#######",
+        "#.   .#",
+        "# $ $ #",
+        "#     #",
+        "#  @  #",
+        "#######",
+    ], [2, 3])
+    heuristic = MatchingHeuristic(level)
+    first, second = level.startStones
+    assignment = heuristic.solve(level.startStones)
+    assert assignment is not None
+    corner = level.toCell(4, 1)  # a corner off the goals, no goal can be reached from it
+    assert heuristic.update(assignment, (corner, second), 0) is None
@@ -0,0 +1,9 @@
+from Algorithms.a_star import NodePool
+
+def test_push_action_of_a_high_stone_index():
+    # a push is stored as stone index * 4 + direction, which outgrows a byte past 63 stones
+    nodes = NodePool()
+    root = nodes.add(None, 0, 0)
+    child = nodes.add(None, 1, 0, root, 1000 * 4 + 3)
+    assert divmod(nodes.actions[child], 4) == (1000, 3)
+    assert nodes.get_path(child) == [root, child]
@@ -0,0 +1,39 @@
+import os
+import time
+
+from Algorithms import a_star
+from Algorithms.a_star import A_Star_Search, run_parallel_worker
+from Modules.Engine import Level
+
+from conftest import ROOT
+
+def loadCase(test_case):
+    return Level.fromFile(os.path.join(ROOT, 'Test_cases', f'input-{test_case}.txt'))
+
+def test_parallel_search_is_optimal(replay):
+    level = loadCase(4)
+    search = A_Star_Search(level)
+    actions, _ = search.search_parallel(2)
+    assert replay(level, actions)
+    assert sum(level.pathCost(actions)) == 159
+
+def test_timed_out_search_still_reports_its_nodes():
+    search = A_Star_Search(loadCase(5))
+    actions, _ = search.search_parallel(2, max_time=0)
+    assert actions is None
+    assert search.nodes_generated > 0  # the root at least, counted by the worker that owns it
+
+def dyingWorker(level, push_level, tie_break, worker, inboxes, results):
+    """Worker 1 dies at once, as if killed for memory; the others run normally"""
+    if worker == 1:
+        os._exit(1)
+    run_parallel_worker(level, push_level, tie_break, worker, inboxes, results)
+
+def test_dead_worker_does_not_hang_the_master(monkeypatch, replay):
+    monkeypatch.setattr(a_star, 'run_parallel_worker', dyingWorker)
+    level = loadCase(4)
+    search = A_Star_Search(level)
+    start = time.time()
+    actions, _ = search.search_parallel(2, max_time=60)
+    assert time.time() - start < 20
+    assert actions is None or replay(level, actions)
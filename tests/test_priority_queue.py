@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from Modules.PriorityQueue import BucketQueue, TIE_FIFO, TIE_LIFO, TIE_HIGH_G, TIE_LOW_H
+
+def drain(queue):
+    items = []
+    while queue:
+        items.append(queue.pop())
+    return items
+
+def test_keys_come_out_in_order_whatever_the_push_order():
+    random.seed(7)
+    keys = [random.randrange(50) for _ in range(500)]
+    for tieBreak in (TIE_FIFO, TIE_LIFO, TIE_HIGH_G, TIE_LOW_H):
+        queue = BucketQueue(tieBreak)
+        for index, key in enumerate(keys):
+            queue.push(key, index, random.randrange(key + 1))
+        popped = drain(queue)
+        assert [key for key, _ in popped] == sorted(keys)
+        assert sorted(item for _, item in popped) == list(range(len(keys)))
+
+def test_fifo_and_lifo_ties():
+    fifo, lifo = BucketQueue(TIE_FIFO), BucketQueue(TIE_LIFO)
+    for item in 'abc':
+        fifo.push(3, item)
+        lifo.push(3, item)
+    assert [item for _, item in drain(fifo)] == ['a', 'b', 'c']
+    assert [item for _, item in drain(lifo)] == ['c', 'b', 'a']
+
+def test_g_and_h_ties():
+    # f = 10 for all three, so the deepest node (largest g) is also the one with the lowest h
+    for tieBreak in (TIE_HIGH_G, TIE_LOW_H):
+        queue = BucketQueue(tieBreak)
+        queue.push(10, 'shallow', 2)
+        queue.push(10, 'deep', 9)
+        queue.push(10, 'middle', 5)
+        queue.push(11, 'later', 11)
+        assert [item for _, item in drain(queue)] == ['deep', 'middle', 'shallow', 'later']
+
+def test_push_below_the_cursor():
+    queue = BucketQueue(TIE_LOW_H)
+    queue.push(5, 'a', 1)
+    queue.push(5, 'b', 4)
+    assert queue.pop() == (5, 'b')
+    queue.push(2, 'c', 0)
+    queue.push(5, 'd', 5)
+    assert drain(queue) == [(2, 'c'), (5, 'd'), (5, 'a')]
+
+def test_empty_pop_and_unknown_tie_break():
+    with pytest.raises(IndexError):
+        BucketQueue().pop()
+    with pytest.raises(ValueError):
+        BucketQueue('random')
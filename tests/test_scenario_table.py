@@ -0,0 +1,96 @@
+from Modules import MazeHelper
+from Modules.Engine import Level
+
+# two stones stacked against a wall, anchored on the right-hand column of a 4x4 window
+LEFT_WALL_SCENARIO = "  #$\n  #$\n____\n____\n"
+
+AGAINST_WALL = [
+    "#######",
+    "#@    #",
+    "#$  ..#",
+    "#$    #",
+    "#     #",
+    "#######",
+]
+
+OFF_WALL = [
+    "#######",
+    "#@    #",
+    "# $ ..#",
+    "# $   #",
+    "#     #",
+    "#######",
+]
+
+def loadScenarios(tmp_path, text):
+    path = tmp_path / 'scenarios.txt'
+    path.write_text(text)
+    return MazeHelper.loadScenarioFile(str(path))
+
+def referenceDeadlock(level, stones, table, scenarios, rockCell):
+    """Read every anchored window cell by cell from (row, col), cells off the padded grid as walls"""
+    row, col = divmod(rockCell, level.width)
+    variants = [variant for scenario in scenarios for variant in MazeHelper.getScenarioVariants(scenario)]
+    for i, j in table.anchors:
+        window = []
+        for r in range(row - i, row - i + table.size):
+            for c in range(col - j, col - j + table.size):
+                cell = r * level.width + c
+                if not (0 <= r < level.height and 0 <= c < level.width) or not level.floor[cell]:
+                    window.append('#')
+                else:
+                    window.append('$' if cell in stones else ' ')
+        for variant in variants:
+            if all(symbol == ' ' or symbol == seen for symbol, seen in zip(sum(variant, []), window)):
+                return True
+    return False
+
+def test_four_by_four_scenario_next_to_left_wall(tmp_path):
+    scenarios = loadScenarios(tmp_path, LEFT_WALL_SCENARIO)
+    table = MazeHelper.ScenarioTable(scenarios)
+    assert (0, 3) in table.anchors
+    level = Level(AGAINST_WALL, [1, 1])
+    stones = level.startStones
+    assert [level.toPosition(stone) for stone in stones] == [(2, 1), (3, 1)]
+    # the windows anchored on column 3 start one column left of the padded grid
+    for stone in stones:
+        assert table.isDeadlock(level, stones, stone)
+
+def test_four_by_four_scenario_away_from_wall(tmp_path):
+    table = MazeHelper.ScenarioTable(loadScenarios(tmp_path, LEFT_WALL_SCENARIO))
+    level = Level(OFF_WALL, [1, 1])
+    stones = level.startStones
+    for stone in stones:
+        assert not table.isDeadlock(level, stones, stone)
+
+def test_table_matches_reference_on_every_cell(tmp_path):
+    scenarios = loadScenarios(tmp_path, LEFT_WALL_SCENARIO)
+    table = MazeHelper.ScenarioTable(scenarios)
+    for rows in (AGAINST_WALL, OFF_WALL):
+        level = Level(rows, [1, 1])
+        for cell in range(level.size):
+            if not level.floor[cell]:
+                continue
+            for other in (cell - level.width, cell + level.width, cell - 1, cell + 1):
+                stones = (cell, other)
+                if level.floor[other]:
+                    assert table.isDeadlock(level, stones, cell) == referenceDeadlock(level, stones, table, scenarios, cell)
+
+def oldMatchScenario(mazeMatrix, scenario):
+    """The matcher the table replaced: every rotation and flip compared symbol by symbol"""
+    for variant in MazeHelper.getScenarioVariants(scenario):
+        if all(symbol == ' ' or (symbol == '#' and MazeHelper.isWall(mazeMatrix[i][j])) or (symbol == '$' and MazeHelper.isRock(mazeMatrix[i][j]))
+               for i, row in enumerate(variant) for j, symbol in enumerate(row)):
+            return True
+    return False
+
+def test_compiled_table_matches_old_matcher_on_every_neighborhood():
+    symbols = (' ', '#', '$')
+    for code in range(3 ** 9):
+        cells = []
+        for _ in range(9):
+            code, digit = divmod(code, 3)
+            cells.append(symbols[digit])
+        mazeMatrix = [cells[0:3], cells[3:6], cells[6:9]]
+        expected = any(oldMatchScenario(mazeMatrix, scenario) for scenario in MazeHelper.SCENARIOS)
+        assert MazeHelper.isDeadlockScenario(mazeMatrix) == expected
@@ -0,0 +1,69 @@
+import itertools
+
+import pytest
+
+from Modules import SolutionCache as solution_cache
+from Modules.SolutionCache import SolutionCache
+
+VERSION = 'v1'
+
+class Clock:
+    """Stand-in for the time module that ticks once per call, so last_used never ties"""
+    def __init__(self):
+        self.ticks = itertools.count(1)
+
+    def time(self):
+        return float(next(self.ticks))
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(solution_cache, 'time', Clock())
+    cache = SolutionCache(str(tmp_path / 'solutions.db'), maxEntries=2)
+    yield cache
+    cache.close()
+
+def makeBlock(path):
+    return f"A*\nSteps: {len(path)}, Weight: 0, Nodes: 1, Time (ms): 1.00, Memory (MB): 1.00\n{path}\n"
+
+def test_put_returns_the_stored_block(cache):
+    assert cache.put('level-1', 'A*', VERSION, makeBlock('rR'))
+    assert cache.get('level-1', 'A*', VERSION) == makeBlock('rR')
+    assert not cache.put('level-2', 'A*', VERSION, makeBlock('No solution'))
+    assert len(cache) == 1
+
+def test_put_past_max_entries_evicts_least_recently_used(cache):
+    for name in ('level-1', 'level-2', 'level-3'):
+        cache.put(name, 'A*', VERSION, makeBlock('u'))
+    assert len(cache) == 2
+    assert cache.get('level-1', 'A*', VERSION) is None
+    assert cache.get('level-2', 'A*', VERSION) is not None
+    assert cache.get('level-3', 'A*', VERSION) is not None
+
+def test_get_refreshes_recency(cache):
+    cache.put('level-1', 'A*', VERSION, makeBlock('u'))
+    cache.put('level-2', 'A*', VERSION, makeBlock('u'))
+    assert cache.get('level-1', 'A*', VERSION) is not None # level-2 is now the oldest
+    cache.put('level-3', 'A*', VERSION, makeBlock('u'))
+    assert cache.get('level-2', 'A*', VERSION) is None
+    assert cache.get('level-1', 'A*', VERSION) is not None
+    assert cache.get('level-3', 'A*', VERSION) is not None
+
+def test_changed_version_misses(cache):
+    cache.put('level-1', 'A*', VERSION, makeBlock('u'))
+    assert cache.get('level-1', 'A*', 'v2') is None
+    assert cache.get('level-1', 'UCS', VERSION) is None
+    assert cache.get('level-1', 'A*', VERSION) is not None
+
+def test_invalidate_by_algorithm_and_level(tmp_path):
+    cache = SolutionCache(str(tmp_path / 'solutions.db'))
+    try:
+        for name, algorithm in itertools.product(('level-1', 'level-2'), ('A*', 'UCS')):
+            cache.put(name, algorithm, VERSION, makeBlock('u'))
+        assert cache.invalidate(algorithm='UCS', level='level-1') == 1
+        assert cache.invalidate(algorithm='UCS') == 1
+        assert cache.invalidate(level='level-2') == 1
+        assert cache.get('level-1', 'A*', VERSION) is not None
+        assert cache.invalidate() == 1
+        assert len(cache) == 0
+    finally:
+        cache.close()
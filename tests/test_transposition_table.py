@@ -0,0 +1,18 @@
+from Algorithms.ida_star import TranspositionTable
+from Modules.Engine import State
+
+def test_hash_collision_is_not_a_hit():
+    table = TranspositionTable(size_bits=4)
+    first = State(10, (20, 30), 12345)
+    other = State(11, (21, 30), 12345)  # same Zobrist hash, different position
+    assert table.admit(first, 3, 1)
+    assert table.admit(other, 5, 1)
+    assert table.hits == 0
+
+def test_same_state_entered_again():
+    table = TranspositionTable(size_bits=4)
+    assert table.admit(State(10, (20, 30), 99), 3, 1)
+    assert not table.admit(State(10, (20, 30), 99), 4, 1)
+    assert table.admit(State(10, (20, 30), 99), 2, 1)
+    assert table.admit(State(10, (20, 30), 99), 4, 2)  # entries of older iterations count as empty
+    assert table.hits == 1
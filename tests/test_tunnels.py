@@ -0,0 +1,42 @@
+from Algorithms import bfs
+from Modules.Engine import Level
+
+# a stone at the mouth of a four-cell tunnel, its goal past the far end; the stone on (3, 8) keeps that end from being a goal room
+TUNNEL_LEVEL = [
+    "###########",
+    "#   #######",
+    "# @$     .#",
+    "#   ####* #",
+    "###########",
+]
+WEIGHTS = [2, 1]
+RIGHT = 3
+
+def test_tunnel_macro_is_one_push_successor():
+    level = Level(TUNNEL_LEVEL, WEIGHTS)
+    assert level.rooms == []
+    # the first push only brings the stone into the tunnel, the player is still outside it
+    key = level.normalize(level.initialState())
+    [(push, _, pushes, key)] = list(level.pushSuccessors(key, level.startPlayer))
+    assert push == (0, RIGHT) and pushes == 1
+    # from inside the tunnel the stone is pushed straight through to the far end
+    [(push, walkSteps, pushes, key)] = list(level.pushSuccessors(key, level.toCell(2, 3)))
+    assert (push, walkSteps, pushes) == ((0, RIGHT), 0, 4)
+    assert level.toPosition(key.stones[0]) == (2, 8)
+
+def test_tunnel_macro_expands_to_every_push(replay):
+    level = Level(TUNNEL_LEVEL, WEIGHTS)
+    path = level.expandPushes([(0, RIGHT)] * 3)
+    assert path == 'RRRRRR'
+    assert replay(level, path)
+    assert level.pathCost(path) == (6, 12)
+
+def test_push_level_bfs_replays_through_the_tunnel(replay, tmp_path):
+    level = Level(TUNNEL_LEVEL, WEIGHTS)
+    level_file = tmp_path / 'input.txt'
+    level_file.write_text(' '.join(map(str, WEIGHTS)) + '\n' + '\n'.join(TUNNEL_LEVEL) + '\n')
+    output_file = tmp_path / 'output.txt'
+    bfs.MazeSolver(str(level_file), str(output_file), True).bfs()
+    path = output_file.read_text().split('\n')[2]
+    assert path == 'RRRRRR'
+    assert replay(level, path)
@@ -0,0 +1,29 @@
+from Algorithms.a_star import A_Star_Search
+from Algorithms.ucs import MazeSolver
+from Modules.Engine import Level
+
+# the heavy stone makes some pushes far dearer than a step, so a state is often queued first through a
+# costly push and reached again later through a cheaper walk-around
+MAZE = [
+    "#######",
+    "#@    #",
+    "# $   #",
+    "#   $ #",
+    "# .  .#",
+    "#######",
+]
+WEIGHTS = [50, 1]
+
+def test_cheaper_path_found_later_leaves_stale_entries(replay):
+    level = Level(MAZE, WEIGHTS)
+    solver = MazeSolver(MAZE, WEIGHTS)
+    solution, stats = solver.solve_ucs()
+    path = ''.join(solution)
+    assert replay(level, path)
+
+    search = A_Star_Search(level)
+    nodes, _ = search.search()
+    optimal = sum(level.pathCost(search.get_actions(nodes[-1])))
+    assert stats['steps'] + stats['weight'] == optimal == 110
+    assert stats['stale_pops'] > 0
+    assert stats['duplicates'] > 0